@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class AuthConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "accounts"
+
+    def ready(self):
+        # registers the user state cache eviction signals and the OpenAPI extensions
+        from accounts import authentication, schema  # noqa: F401
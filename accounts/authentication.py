@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from accounts.models import User
+from accounts.revocation import is_revoked
+
+# users whose active / password state each process remembers, and for how many seconds
+USER_STATE_CACHE_SIZE = 4096
+USER_STATE_CACHE_TTL = 30
+
+
+class LRUTTLCache:
+    """
+    Small thread safe LRU cache whose entries also expire `ttl` seconds after they were set
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return default
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def discard(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+# user id -> (is_active, md5 of the password hash), None for deleted users
+_user_states = LRUTTLCache(USER_STATE_CACHE_SIZE, USER_STATE_CACHE_TTL)
+_MISSING = object()
+
+
+def get_user_state(user_id):
+    state = _user_states.get(user_id, _MISSING)
+    if state is _MISSING:
+        user = User.objects.filter(pk=user_id).only("password").first()
+        state = (user.is_active, get_md5_hash_password(user.password)) if user else None
+        _user_states.set(user_id, state)
+    return state
+
+
+@receiver([post_save, post_delete], sender=User)
+def evict_user_state(sender, instance, **kwargs):
+    # other processes pick the change up once their entry expires
+    _user_states.discard(str(instance.pk))
+
+
+class RevocationCheckMixin:
+    """
+    Rejects access tokens whose jti was revoked on logout
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_revoked(validated_token.get(api_settings.JTI_CLAIM)):
+            raise InvalidToken(_("Token is revoked"))
+        return validated_token
+
+
+class RevocableJWTAuthentication(RevocationCheckMixin, JWTAuthentication):
+    pass
+
+
+class RevocableStatelessJWTAuthentication(RevocationCheckMixin, JWTStatelessUserAuthentication):
+    """
+    Signed claims only, no user row is loaded, but tokens revoked on logout are still rejected
+    """
+
+
+class CachedUserStateJWTAuthentication(RevocationCheckMixin, JWTStatelessUserAuthentication):
+    """
+    Stateless JWT authentication that still rejects deleted or inactive users and tokens revoked by a
+    password change, like `JWTAuthentication`. The user state comes from a per-process LRU+TTL cache,
+    so a DB query is only made once per user every `USER_STATE_CACHE_TTL` seconds.
+    """
+
+    def get_user(self, validated_token):
+        token_user = super().get_user(validated_token)
+        state = get_user_state(str(validated_token[api_settings.USER_ID_CLAIM]))
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        is_active, password_hash = state
+        if api_settings.CHECK_USER_IS_ACTIVE and not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_hash:
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return token_user
+
+
+async def aauthenticate(request):
+    """
+    JWT authentication for plain async Django views, which DRF's APIView does not run natively.
+    :return: the token user, None if the token is missing or invalid
+    """
+    try:
+        result = await sync_to_async(CachedUserStateJWTAuthentication().authenticate)(request)
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    return result[0] if result else None
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher, ScryptPasswordHasher
+
+# upper bound on the memory scrypt may use, also verifies hashes made with a larger work factor than today's
+SCRYPT_MAXMEM = 256 * 1024 * 1024
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with `PASSWORD_HASH_PBKDF2_ITERATIONS` iterations, Django's count when unset. Same algorithm
+    name as Django's hasher, so existing hashes verify and are re-encoded on login when the iteration count differs.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_PBKDF2_ITERATIONS or super().iterations
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    scrypt with the `PASSWORD_HASH_SCRYPT_*` costs, memory use is 128 * work_factor * block_size bytes
+    """
+
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_HASH_SCRYPT_WORK_FACTOR or super().work_factor
+
+    @property
+    def block_size(self):
+        return settings.PASSWORD_HASH_SCRYPT_BLOCK_SIZE or super().block_size
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_HASH_SCRYPT_PARALLELISM or super().parallelism
+
+    @property
+    def maxmem(self):
+        return max(SCRYPT_MAXMEM, 2 * 128 * self.work_factor * self.block_size * self.parallelism)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    argon2id with the `PASSWORD_HASH_ARGON2_*` costs, needs the optional `argon2-cffi` package
+    """
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_HASH_ARGON2_TIME_COST or super().time_cost
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_HASH_ARGON2_MEMORY_COST or super().memory_cost
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_HASH_ARGON2_PARALLELISM or super().parallelism
@@ -0,0 +1,31 @@
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import User, slug_from_uuid
+
+
+class Command(BaseCommand):
+    help = "Gives users without a slug one derived from their id, --all also re-derives the existing random slugs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="re-derive every slug, changes public slugs")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        users = User.objects.all() if options["all"] else User.objects.filter(slug="")
+        targets = list(users.only("id", "slug"))
+        # every current slug, with --all a new slug must not clash with the old slug of a row updated later
+        taken = set(User.objects.exclude(slug="").values_list("slug", flat=True)) if targets else set()
+
+        for user in targets:
+            slug = slug_from_uuid(user.id)
+            while slug in taken:
+                slug = slug_from_uuid(uuid.uuid4())
+            taken.add(slug)
+            user.slug = slug
+
+        with transaction.atomic():
+            User.objects.bulk_update(targets, ["slug"], batch_size=options["batch_size"])
+        self.stdout.write(f"✅ {len(targets)} user slugs backfilled.")
@@ -0,0 +1,79 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, get_hasher
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from accounts.models import User
+from accounts.views import UserLoginView
+from app.bench import format_table, summarize, timed
+
+BENCH_EMAIL_DOMAIN = "bench-login.example.invalid"
+BENCH_PASSWORD = "bench-login-password"
+
+# Django's PBKDF2 cost before the hasher policy, hashes made with it are re-encoded on their first login
+LEGACY_PBKDF2_ITERATIONS = 600000
+
+
+class LegacyPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = LEGACY_PBKDF2_ITERATIONS
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures logins per second on one core through the login view with the configured PASSWORD_HASHER, "
+        "and the first login of users whose hash predates it. Writes bench users to the configured database "
+        "and removes them afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--duration", type=float, default=10, help="seconds of back to back logins")
+        parser.add_argument(
+            "--legacy-users", type=int, default=5,
+            help=f"users with a {LEGACY_PBKDF2_ITERATIONS} iteration PBKDF2 hash, 0 skips them",
+        )
+
+    def handle(self, *args, **options):
+        view = UserLoginView.as_view(throttle_classes=[])
+        factory = APIRequestFactory()
+
+        def login(email):
+            response = view(factory.post("/login/", {"email": email, "password": BENCH_PASSWORD}, format="json"))
+            if response.status_code != 200:
+                raise RuntimeError(f"login of {email} answered {response.status_code}")
+
+        hasher = get_hasher()
+        users = []
+        rows = []
+        try:
+            user = User.objects.create_user(f"current@{BENCH_EMAIL_DOMAIN}", "bench", password=BENCH_PASSWORD)
+            users.append(user)
+            latencies = []
+            deadline = time.monotonic() + options["duration"]
+            while time.monotonic() < deadline:
+                latencies.append(timed(login, user.email)[1])
+            rows.append(summarize(f"login, {settings.PASSWORD_HASHER} policy", latencies, options["duration"]))
+
+            legacy = LegacyPBKDF2PasswordHasher()
+            latencies, upgraded = [], 0
+            for index in range(options["legacy_users"]):
+                user = User.objects.create_user(f"legacy{index}@{BENCH_EMAIL_DOMAIN}", "bench")
+                user.password = legacy.encode(BENCH_PASSWORD, legacy.salt())
+                user.save(update_fields=["password"])
+                users.append(user)
+                latencies.append(timed(login, user.email)[1])
+                user.refresh_from_db(fields=["password"])
+                upgraded += hasher.verify(BENCH_PASSWORD, user.password) and not hasher.must_update(user.password)
+            if latencies:
+                rows.append(summarize(f"first login, pbkdf2 {LEGACY_PBKDF2_ITERATIONS} hash", latencies))
+        finally:
+            OutstandingToken.objects.filter(user__in=users).delete()
+            User.objects.filter(email__endswith=f"@{BENCH_EMAIL_DOMAIN}").delete()
+
+        self.stdout.write(format_table(rows))
+        # the benchmark runs in this process only, so the rate is the one of a single core
+        self.stdout.write(f"✅ {rows[0]['ops_s']:.1f} logins/s per core with {hasher.algorithm}.")
+        if options["legacy_users"]:
+            self.stdout.write(f"{upgraded} of {options['legacy_users']} legacy hashes re-encoded with the policy.")
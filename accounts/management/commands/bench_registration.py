@@ -0,0 +1,54 @@
+import random
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import SLUG_ALPHABET, SLUG_LENGTH, User
+from app.bench import format_table, summarize, timed
+
+BENCH_EMAIL_DOMAIN = "bench-registration.example.invalid"
+
+
+def _probed_slug():
+    # the slug strategy before the pk derived one, random draws checked with a query until one is free
+    while True:
+        slug = "".join(random.choices(SLUG_ALPHABET, k=SLUG_LENGTH))
+        if not User.objects.filter(slug=slug).exists():
+            return slug
+
+
+def register_probing(email):
+    # a preset slug skips the derivation in User.save
+    User.objects.create_user(email, "bench", slug=_probed_slug())
+
+
+def register(email):
+    # no password, no hashing in the measure
+    User.objects.create_user(email, "bench")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures registrations per second with the primary key derived slug against the former "
+        "check-then-insert slug. Password hashing is left out. Writes bench users to the configured "
+        "database and removes them afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2000, help="registrations per strategy")
+
+    def handle(self, *args, **options):
+        rows = []
+        try:
+            for prefix, name, strategy in (
+                ("probed", "slug probed with a query (before)", register_probing),
+                ("derived", "slug derived from the pk (after)", register),
+            ):
+                latencies = [
+                    timed(strategy, f"{prefix}{index}@{BENCH_EMAIL_DOMAIN}")[1] for index in range(options["users"])
+                ]
+                rows.append(summarize(name, latencies, sum(latencies)))
+        finally:
+            User.objects.filter(email__endswith=f"@{BENCH_EMAIL_DOMAIN}").delete()
+
+        self.stdout.write(format_table(rows))
+        self.stdout.write(f"✅ {options['users']} registrations per strategy.")
@@ -0,0 +1,93 @@
+import json
+import uuid
+
+from django.core.management.base import BaseCommand
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from accounts.renderers import UserRenderer
+from app import renderers as app_renderers
+from app.bench import format_table, summarize, timed
+from app.renderers import FastJSONRenderer
+from coins.fetch_tickers import TICKER_FIELDS
+
+# renders per sample of the small payloads, one render is below the table's resolution
+SMALL_BATCH = 1000
+
+
+class LegacyUserRenderer(JSONRenderer):
+    # UserRenderer before the structural error check, the payload is stringified, then encoded again
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if "ErrorDetail" in str(data):
+            return json.dumps({"errors": data})
+        return json.dumps(data)
+
+
+def ticker_payload(count):
+    # a day of tickers the way the listing serializes them, decimals as fixed point strings
+    return [
+        {
+            "id": index,
+            "symbol": f"SYM{index}USDT",
+            **{field: f"{index * 1.37:.8f}" for field in TICKER_FIELDS},
+            "open_time": 1700000000000, "close_time": 1700086400000, "first_id": index, "last_id": index + 99,
+            "count": 100,
+            "fetched_at": "2024-03-01",
+        }
+        for index in range(count)
+    ]
+
+
+def profile_payload():
+    return {
+        "id": str(uuid.uuid4()), "slug": "A1B2C3D4", "email": "someone@example.com", "name": "Someone",
+        "image": None, "login_method": "local", "created_at": "2024-03-01T12:00:00Z",
+        "updated_at": "2024-03-01T12:00:00Z",
+    }
+
+
+def error_payload():
+    return {"email": [ErrorDetail("Enter a valid email address.", code="invalid")]}
+
+
+class Command(BaseCommand):
+    help = "Measures the render time of a large ticker listing, a profile and an error payload per JSON renderer"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickers", type=int, default=12000, help="rows in the ticker listing payload")
+        parser.add_argument("--runs", type=int, default=20, help="renders of the ticker listing")
+        parser.add_argument(
+            "--small-runs", type=int, default=20, help=f"samples of {SMALL_BATCH} renders of the profile and the error",
+        )
+
+    def handle(self, *args, **options):
+        if app_renderers.orjson is None:
+            self.stdout.write("orjson is not installed, FastJSONRenderer measures its stdlib fallback")
+
+        payloads = (
+            ("tickers", ticker_payload(options["tickers"]), 200, options["runs"], 1),
+            (f"profile x{SMALL_BATCH}", profile_payload(), 200, options["small_runs"], SMALL_BATCH),
+            (f"error x{SMALL_BATCH}", error_payload(), 400, options["small_runs"], SMALL_BATCH),
+        )
+        renderers = (
+            ("DRF JSONRenderer", JSONRenderer()),
+            ("FastJSONRenderer", FastJSONRenderer()),
+            ("old UserRenderer", LegacyUserRenderer()),
+            ("UserRenderer", UserRenderer()),
+        )
+
+        rows = []
+        for payload_name, data, status, runs, batch in payloads:
+            context = {"response": Response(status=status)}
+            for renderer_name, renderer in renderers:
+
+                def sample():
+                    for _ in range(batch):
+                        renderer.render(data, None, context)
+
+                latencies = [timed(sample)[1] for _ in range(runs)]
+                rows.append(summarize(f"{payload_name}, {renderer_name}", latencies))
+
+        self.stdout.write(format_table(rows))
+        self.stdout.write("✅ Render times measured.")
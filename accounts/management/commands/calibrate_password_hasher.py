@@ -0,0 +1,102 @@
+import hashlib
+import secrets
+import time
+
+from django.contrib.auth.hashers import Argon2PasswordHasher
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.hashers import SCRYPT_MAXMEM
+
+
+def _timed_ms(func, samples):
+    # best of `samples`, the least disturbed run is the closest to the real cost
+    best = None
+    for _ in range(samples):
+        started = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the password hasher costs on this machine and prints the PASSWORD_HASH_* settings "
+        "closest to the target latency per hash"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--algorithm", choices=["pbkdf2", "scrypt", "argon2"], default="pbkdf2")
+        parser.add_argument("--target-ms", type=float, default=100, help="target time of one hash")
+        parser.add_argument("--samples", type=int, default=3)
+        parser.add_argument("--argon2-memory-cost", type=int, default=65536, help="KiB, kept fixed")
+
+    def handle(self, *args, **options):
+        target, samples = options["target_ms"], options["samples"]
+        password, salt = secrets.token_bytes(16), secrets.token_bytes(16)
+
+        if options["algorithm"] == "pbkdf2":
+            probe = 100000
+            per_iteration = _timed_ms(lambda: hashlib.pbkdf2_hmac("sha256", password, salt, probe), samples) / probe
+            iterations = max(10000, int(round(target / per_iteration, -4)))
+            elapsed = _timed_ms(lambda: hashlib.pbkdf2_hmac("sha256", password, salt, iterations), samples)
+            env = {"PASSWORD_HASHER": "pbkdf2", "PASSWORD_HASH_PBKDF2_ITERATIONS": iterations}
+
+        elif options["algorithm"] == "scrypt":
+            # work factor must be a power of two, take the largest one within the target
+            work_factor, elapsed = 2**10, None
+            while True:
+                candidate = work_factor * 2
+                took = _timed_ms(
+                    lambda: hashlib.scrypt(password, salt=salt, n=candidate, r=8, p=1, maxmem=SCRYPT_MAXMEM),
+                    samples,
+                )
+                if took > target or 128 * candidate * 8 > SCRYPT_MAXMEM // 2:
+                    break
+                work_factor, elapsed = candidate, took
+            if elapsed is None:
+                elapsed = _timed_ms(
+                    lambda: hashlib.scrypt(password, salt=salt, n=work_factor, r=8, p=1, maxmem=SCRYPT_MAXMEM),
+                    samples,
+                )
+            env = {
+                "PASSWORD_HASHER": "scrypt",
+                "PASSWORD_HASH_SCRYPT_WORK_FACTOR": work_factor,
+                "PASSWORD_HASH_SCRYPT_BLOCK_SIZE": 8,
+                "PASSWORD_HASH_SCRYPT_PARALLELISM": 1,
+            }
+
+        else:
+            try:
+                argon2 = Argon2PasswordHasher()._load_library()
+            except ValueError as e:
+                raise CommandError(f"{e}, install argon2-cffi")
+            memory_cost = options["argon2_memory_cost"]
+
+            def hash_with(time_cost):
+                return lambda: argon2.low_level.hash_secret_raw(
+                    password, salt, time_cost=time_cost, memory_cost=memory_cost, parallelism=1,
+                    hash_len=32, type=argon2.low_level.Type.ID,
+                )
+
+            time_cost = 1
+            elapsed = _timed_ms(hash_with(time_cost), samples)
+            while True:
+                took = _timed_ms(hash_with(time_cost + 1), samples)
+                if took > target:
+                    break
+                time_cost, elapsed = time_cost + 1, took
+            env = {
+                "PASSWORD_HASHER": "argon2",
+                "PASSWORD_HASH_ARGON2_TIME_COST": time_cost,
+                "PASSWORD_HASH_ARGON2_MEMORY_COST": memory_cost,
+                "PASSWORD_HASH_ARGON2_PARALLELISM": 1,
+            }
+
+        for name, value in env.items():
+            self.stdout.write(f"{name}={value}")
+        # a login is one hash verification, the rest of the request is noise next to it
+        self.stdout.write(
+            f"✅ {elapsed:.1f} ms per hash, about {1000 / elapsed:.0f} logins/s per core "
+            f"(target {target:g} ms)."
+        )
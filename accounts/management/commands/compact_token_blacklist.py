@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from accounts.revocation import revoke
+
+
+class Command(BaseCommand):
+    help = (
+        "Compacts the simplejwt token tables: deletes expired outstanding tokens with their blacklist "
+        "entries and reloads the live blacklisted jtis into the revocation store"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="rows deleted per statement")
+        parser.add_argument(
+            "--prune-outstanding-days",
+            type=int,
+            default=None,
+            help="also delete never blacklisted outstanding tokens issued more than this many days ago, "
+                 "blacklisting one later recreates its row",
+        )
+
+    def delete_in_batches(self, queryset, batch_size):
+        deleted = 0
+        while True:
+            pks = list(queryset.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                return deleted
+            # cascades to BlacklistedToken
+            OutstandingToken.objects.filter(pk__in=pks).delete()
+            deleted += len(pks)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        now = timezone.now()
+
+        expired = self.delete_in_batches(OutstandingToken.objects.filter(expires_at__lte=now), batch_size)
+        self.stdout.write(f"✅ {expired} expired tokens deleted.")
+
+        if options["prune_outstanding_days"] is not None:
+            cutoff = now - timedelta(days=options["prune_outstanding_days"])
+            pruned = self.delete_in_batches(
+                OutstandingToken.objects.filter(created_at__lt=cutoff, blacklistedtoken__isnull=True),
+                batch_size,
+            )
+            self.stdout.write(f"✅ {pruned} outstanding tokens pruned.")
+
+        live = (
+            BlacklistedToken.objects.filter(token__expires_at__gt=now)
+            .values_list("token__jti", "token__expires_at")
+            .iterator(chunk_size=batch_size)
+        )
+        count = 0
+        for jti, expires_at in live:
+            revoke({api_settings.JTI_CLAIM: jti, "exp": expires_at.timestamp()})
+            count += 1
+        self.stdout.write(f"✅ {count} revoked tokens loaded into the revocation store.")
@@ -0,0 +1,99 @@
+import csv
+import json
+import uuid
+from pathlib import Path
+
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from accounts.models import User, slug_from_uuid
+
+
+def read_rows(path, fmt):
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def encoded_password(raw):
+    """
+    Keeps passwords that already are Django hashes, hashes plain ones and makes empty ones unusable
+    """
+    if not raw:
+        return make_password(None)
+    try:
+        identify_hasher(raw)
+        return raw
+    except ValueError:
+        return make_password(raw)
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports users from a CSV or JSONL file with email, name and optional password / login_method columns. "
+        "Passwords that are already Django hashes are stored as is, existing emails are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="taken from the file extension by default")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--login-method", default="local", help="for rows without a login_method")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"{path} does not exist")
+        fmt = options["format"] or ("csv" if path.suffix.lower() == ".csv" else "jsonl")
+
+        stats = {"created": 0, "skipped": 0}
+        seen = set()
+        batch = []
+        for row in read_rows(path, fmt):
+            email = User.objects.normalize_email((row.get("email") or "").strip())
+            if not email or email in seen:
+                stats["skipped"] += 1
+                continue
+            seen.add(email)
+
+            # bulk_create skips save(), so the id and its slug are set here
+            user_id = uuid.uuid4()
+            batch.append(User(
+                id=user_id,
+                slug=slug_from_uuid(user_id),
+                email=email,
+                name=row.get("name") or "",
+                password=encoded_password(row.get("password")),
+                login_method=row.get("login_method") or options["login_method"],
+            ))
+            if len(batch) >= options["batch_size"]:
+                self.import_batch(batch, stats)
+                batch = []
+        if batch:
+            self.import_batch(batch, stats)
+
+        self.stdout.write(f"✅ {stats['created']} users imported, {stats['skipped']} skipped.")
+
+    def import_batch(self, users, stats):
+        existing = set(User.objects.filter(email__in=[u.email for u in users]).values_list("email", flat=True))
+        users = [u for u in users if u.email not in existing]
+        stats["skipped"] += len(existing)
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+        except IntegrityError:
+            # a slug collision (or a concurrent signup), save() retries those one user at a time
+            for user in users:
+                try:
+                    user.slug = ""
+                    user.save()
+                    stats["created"] += 1
+                except IntegrityError:
+                    stats["skipped"] += 1
+            return
+        stats["created"] += len(users)
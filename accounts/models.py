@@ -1,20 +1,20 @@
 import uuid
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
-from django.db import models
+from django.db import IntegrityError, models, transaction
 import string
-import random
 
 
 class UserManager(BaseUserManager):
-    def create_user(self, email, name, password=None, password2=None):
+    def create_user(self, email, name, password=None, password2=None, **extra_fields):
         """
         Creates and saves a User with the given email, name, tc and password.
+        :param extra_fields: other model fields, e.g. login_method, set before the single INSERT
         """
         if not email:
             raise ValueError("Users must have an email address")
 
         user = self.model(
-            email=self.normalize_email(email), name=name
+            email=self.normalize_email(email), name=name, **extra_fields
         )
 
         user.set_password(password)
@@ -25,19 +25,31 @@ class UserManager(BaseUserManager):
         """
         Creates and saves a superuser with the given email, name, tc and password.
         """
-        user = self.create_user(
+        return self.create_user(
             email,
             password=password,
             name=name,
+            is_admin=True,
         )
-        user.is_admin = True
-        user.save(using=self._db)
-        return user
 
 
-def generate_unique_slug(length=8):
-    characters = string.ascii_uppercase + string.digits  # Uppercase letters and digits
-    return ''.join(random.choices(characters, k=length))
+SLUG_ALPHABET = string.ascii_uppercase + string.digits  # Uppercase letters and digits
+SLUG_LENGTH = 8
+
+# inserts tried before a slug collision is reported, one is a ~1e-6 chance at a million users
+SLUG_ATTEMPTS = 3
+
+
+def slug_from_uuid(value, length=SLUG_LENGTH):
+    """
+    Base36 encoding of the low digits of `value`, uuid4 makes them uniformly random
+    """
+    number = value.int % len(SLUG_ALPHABET) ** length
+    chars = []
+    for _ in range(length):
+        number, index = divmod(number, len(SLUG_ALPHABET))
+        chars.append(SLUG_ALPHABET[index])
+    return ''.join(chars)
 
 
 class User(AbstractBaseUser):
@@ -66,12 +78,21 @@ class User(AbstractBaseUser):
     REQUIRED_FIELDS = ["name"]
 
     def save(self, *args, **kwargs):
-        if not self.slug:  # Generate slug only if it doesn't exist
-            unique_slug = generate_unique_slug()
-            while User.objects.filter(slug=unique_slug).exists():  # Ensure uniqueness
-                unique_slug = generate_unique_slug()
-            self.slug = unique_slug
-        super().save(*args, **kwargs)
+        if self.slug:
+            return super().save(*args, **kwargs)
+
+        # the slug comes from the primary key, the unique constraint catches the rare collision
+        self.slug = slug_from_uuid(self.id)
+        for attempt in range(SLUG_ATTEMPTS):
+            try:
+                with transaction.atomic(using=kwargs.get("using")):
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                # only look the slug up once the write failed, it may be the email that is taken
+                if attempt + 1 == SLUG_ATTEMPTS or not User.objects.filter(slug=self.slug).exists():
+                    self.slug = ""
+                    raise
+                self.slug = slug_from_uuid(uuid.uuid4())
 
     class Meta:
         db_table = "tbl_user_auth"
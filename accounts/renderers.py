@@ -1,15 +1,30 @@
-import json
+from rest_framework.exceptions import ErrorDetail
 
-from rest_framework import renderers
+from app.renderers import FastJSONRenderer
 
 
-class UserRenderer(renderers.JSONRenderer):
+def contains_error_detail(data):
+    """
+    Looks for an ErrorDetail anywhere in `data` without building its repr, stops at the first one
+    """
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, ErrorDetail):
+            return True
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+class UserRenderer(FastJSONRenderer):
     charset = "utf-8"
-    def render(self, data, accepted_media_type=None, renderer_context=None):
-        response: json
-        if "ErrorDetail" in str(data):
-            response = json.dumps({"errors": data})  # if error occurred
-        else:
-            response = json.dumps(data)
 
-        return response
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get("response")
+        # validation errors only come with error statuses, successful payloads are never walked
+        if (response is None or response.status_code >= 400) and contains_error_detail(data):
+            data = {"errors": data}  # if error occurred
+        return super().render(data, accepted_media_type, renderer_context)
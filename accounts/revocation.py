@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def _key(jti):
+    return f"auth:revoked:{jti}"
+
+
+def revoke(token):
+    """
+    Adds the jti of `token` to the revocation store until the token expires, the cache drops it then
+    :param token: validated simplejwt token
+    """
+    remaining = int(token["exp"] - time.time())
+    if remaining > 0:
+        cache.set(_key(token[api_settings.JTI_CLAIM]), 1, remaining)
+
+
+def is_revoked(jti):
+    return jti is not None and cache.get(_key(jti)) is not None
+
+
+class RevocableRefreshToken(RefreshToken):
+    """
+    Refresh token checked against the revocation store instead of a `BlacklistedToken` query.
+
+    Blacklisting still writes the simplejwt tables, they stay the durable record. When the cache is
+    not shared between processes (`TOKEN_REVOCATION_CACHE_SHARED`) a miss falls back to the table.
+    """
+
+    def check_blacklist(self):
+        if is_revoked(self.payload.get(api_settings.JTI_CLAIM)):
+            raise TokenError(_("Token is blacklisted"))
+        if not settings.TOKEN_REVOCATION_CACHE_SHARED:
+            super().check_blacklist()
+
+    def blacklist(self):
+        revoke(self)
+        return super().blacklist()
@@ -0,0 +1,28 @@
+"""
+drf_spectacular extensions for the accounts authentication classes and serializers that subclass
+simplejwt's, spectacular only matches the exact classes it ships extensions for.
+
+Every authentication class gets its own security scheme name, spectacular keys the component on the
+authenticator class and warns when two classes register the same name.
+"""
+
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme, TokenRefreshSerializerExtension
+
+
+class RevocableJWTScheme(SimpleJWTScheme):
+    target_class = "accounts.authentication.RevocableJWTAuthentication"
+    name = "jwtAuth"
+
+
+class RevocableStatelessJWTScheme(SimpleJWTScheme):
+    target_class = "accounts.authentication.RevocableStatelessJWTAuthentication"
+    name = "jwtStatelessAuth"
+
+
+class CachedUserStateJWTScheme(SimpleJWTScheme):
+    target_class = "accounts.authentication.CachedUserStateJWTAuthentication"
+    name = "jwtCachedUserAuth"
+
+
+class RevocableTokenRefreshSerializerExtension(TokenRefreshSerializerExtension):
+    target_class = "accounts.serializers.RevocableTokenRefreshSerializer"
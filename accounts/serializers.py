@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from accounts.models import User
+from accounts.revocation import RevocableRefreshToken
 from django.core.exceptions import ValidationError as DjangoValidationError
 
 
@@ -27,10 +29,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data.pop("password2")  # Remove confirm password
-        user = User.objects.create_user(**validated_data)
-        user.login_method = "local"  # Optional: if you want to centralize this
-        user.save(update_fields=["login_method"])
-        return user
+        return User.objects.create_user(**validated_data, login_method="local")
 
 
 class UserRegistrationResponseSerializer(serializers.Serializer):
@@ -141,3 +140,7 @@ class UserProfilePictureSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['image']
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = RevocableRefreshToken
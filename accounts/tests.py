@@ -1,3 +1,126 @@
-from django.test import TestCase
+import random
+import uuid
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import SimpleTestCase, TestCase
+
+from .models import SLUG_ALPHABET, SLUG_ATTEMPTS, SLUG_LENGTH, User, slug_from_uuid
+from .throttling import SlidingWindowRateThrottle
+
+
+class ClockThrottle(SlidingWindowRateThrottle):
+    scope = "test"
+    rate = "10/min"
+    # seconds since the epoch the throttle sees, set by the tests
+    now = 0.0
+
+    def get_rate(self):
+        return self.rate
+
+    def get_ident_key(self, request, view):
+        return "client"
+
+    def timer(self):
+        return ClockThrottle.now
+
+
+class ThrottledView:
+    throttle_scope = "test"
+
+
+def request_at(now):
+    ClockThrottle.now = now
+    throttle = ClockThrottle()
+    return throttle.allow_request(None, ThrottledView()), throttle
+
+
+class SlidingWindowWaitTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def assert_wait_is_tight(self, denied_at, throttle):
+        wait = throttle.wait()
+        self.assertIsNotNone(wait)
+        if wait > 1:
+            self.assertFalse(request_at(denied_at + wait - 1)[0], "allowed a second before wait()")
+        self.assertTrue(request_at(denied_at + wait)[0], "still denied after wait()")
+
+    def test_limit_reached_at_a_window_boundary(self):
+        start = 6000.0
+        for _ in range(10):
+            self.assertTrue(request_at(start)[0])
+        allowed, throttle = request_at(start)
+
+        self.assertFalse(allowed)
+        # the 10 requests fully weigh on the next window's start, the first allowed second is the one after
+        self.assertEqual(throttle.wait(), 61)
+        self.assert_wait_is_tight(start, throttle)
+
+    def test_wait_matches_the_first_allowed_second(self):
+        for seed in range(300):
+            with self.subTest(seed=seed):
+                cache.clear()
+                rng = random.Random(seed)
+                now = 6000 + rng.uniform(0, 120)
+                while True:
+                    now += rng.expovariate(0.5)
+                    allowed, throttle = request_at(now)
+                    if not allowed:
+                        break
+                self.assert_wait_is_tight(now, throttle)
+
+
+class SlugFromUuidTests(SimpleTestCase):
+    def test_base36_of_the_low_digits(self):
+        self.assertEqual(slug_from_uuid(uuid.UUID(int=0)), "A" * SLUG_LENGTH)
+        self.assertEqual(slug_from_uuid(uuid.UUID(int=1)), "B" + "A" * (SLUG_LENGTH - 1))
+        # only the low digits count
+        wrapped = uuid.UUID(int=len(SLUG_ALPHABET) ** SLUG_LENGTH + 1)
+        self.assertEqual(slug_from_uuid(wrapped), slug_from_uuid(uuid.UUID(int=1)))
+
+    def test_random_uuids_give_valid_slugs(self):
+        for _ in range(100):
+            slug = slug_from_uuid(uuid.uuid4())
+            self.assertEqual(len(slug), SLUG_LENGTH)
+            self.assertTrue(set(slug) <= set(SLUG_ALPHABET))
+
+
+class UserSlugTests(TestCase):
+    def setUp(self):
+        self.taken = User.objects.create_user("taken@b.c", "Taken", password="pw")
+
+    def test_slug_comes_from_the_primary_key(self):
+        self.assertEqual(self.taken.slug, slug_from_uuid(self.taken.id))
+        self.taken.name = "Renamed"
+        self.taken.save()
+        self.taken.refresh_from_db()
+        self.assertEqual(self.taken.slug, slug_from_uuid(self.taken.id))
+
+    def test_slug_collision_is_retried(self):
+        with mock.patch("accounts.models.slug_from_uuid", side_effect=[self.taken.slug, "FRESHSLG"]):
+            user = User.objects.create_user("new@b.c", "New", password="pw")
+
+        self.assertEqual(user.slug, "FRESHSLG")
+        self.assertEqual(User.objects.get(email="new@b.c").slug, "FRESHSLG")
+
+    def test_taken_email_is_not_retried(self):
+        with mock.patch("accounts.models.slug_from_uuid", return_value="FRESHSLG") as slug:
+            user = User(email="taken@b.c", name="Again")
+            with self.assertRaises(IntegrityError):
+                user.save()
+
+        slug.assert_called_once()
+        # a later save draws a slug again instead of keeping the one of the failed insert
+        self.assertEqual(user.slug, "")
+
+    def test_gives_up_after_slug_attempts(self):
+        with mock.patch("accounts.models.slug_from_uuid", return_value=self.taken.slug) as slug:
+            user = User(email="new@b.c", name="New")
+            with self.assertRaises(IntegrityError):
+                user.save()
+
+        self.assertEqual(slug.call_count, SLUG_ATTEMPTS)
+        self.assertEqual(user.slug, "")
+        self.assertFalse(User.objects.filter(email="new@b.c").exists())
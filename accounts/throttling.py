@@ -0,0 +1,89 @@
+import math
+import time
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+def _seconds_past(seconds):
+    # the count only drops below the limit strictly after `seconds`, a whole number has to be exceeded too
+    return math.floor(seconds) + 1
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    Sliding window counter: the count of the current fixed window plus the previous window's count
+    weighted by how much of it still overlaps the sliding window.
+
+    Two counters per client instead of DRF's list of timestamps, so a check is one `get_many` and an
+    allowed request one `incr`, whatever the rate. Counters are kept per view (`throttle_scope`), so
+    login attempts do not use up the registration budget.
+    """
+
+    def get_ident_key(self, request, view):
+        raise NotImplementedError
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident_key(request, view)
+        if not ident:
+            return None
+        return f"throttle:{self.scope}:{getattr(view, 'throttle_scope', type(view).__name__)}:{ident}"
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        window = int(now // self.duration)
+        self.elapsed = now / self.duration - window
+        current_key, previous_key = f"{self.key}:{window}", f"{self.key}:{window - 1}"
+        counts = self.cache.get_many([current_key, previous_key])
+        self.current = counts.get(current_key, 0)
+        self.previous = counts.get(previous_key, 0)
+
+        if self.previous * (1 - self.elapsed) + self.current >= self.num_requests:
+            return False
+        try:
+            self.cache.incr(current_key)
+        except ValueError:
+            # first request of the window, the counter also serves as the next window's previous one
+            self.cache.set(current_key, 1, 2 * self.duration)
+        return True
+
+    def wait(self):
+        """
+        Whole seconds until the weighted count drops below the limit again
+        """
+        if self.current >= self.num_requests:
+            # the current window becomes the previous one, wait until enough of it slid out
+            overlap = 1 - self.num_requests / self.current if self.current else 0
+            return _seconds_past(((1 - self.elapsed) + overlap) * self.duration)
+        if not self.previous:
+            return None
+        fraction = 1 - (self.num_requests - self.current) / self.previous
+        return max(1, _seconds_past((fraction - self.elapsed) * self.duration))
+
+    def timer(self):
+        return time.time()
+
+
+class AuthIPRateThrottle(SlidingWindowRateThrottle):
+    scope = "auth_ip"
+
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+class AuthEmailRateThrottle(SlidingWindowRateThrottle):
+    """
+    Limits attempts on one account whatever the number of IPs they come from
+    """
+    scope = "auth_email"
+
+    def get_ident_key(self, request, view):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        if not email and request.user and request.user.is_authenticated:
+            email = getattr(request.user, "email", None)
+        return str(email).strip().lower() if email else None
@@ -10,6 +10,7 @@ from accounts.views import (
     UserProfileView,
     UserRegistrationView,
     UserProfilePictureUpdateView,
+    google_callback_async_view,
 )
 
 app_name = "accounts"
@@ -28,4 +29,5 @@ urlpatterns = [
     # TODO: google oauth endpoints, as it will not work on localhost it needs redirection and google account setup
     path("google/login/", GoogleHandle.as_view(), name="google"),
     path("google/login/callback/", CallbackHandleView.as_view(), name="callback"),
+    path("google/login/callback/async/", google_callback_async_view, name="callback-async"),
 ]
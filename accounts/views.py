@@ -5,9 +5,12 @@ import secrets
 # from django.urls import reverse
 import urllib.parse
 
+import httpx
 import requests
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth import authenticate
+from django.http import JsonResponse
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
@@ -19,7 +22,11 @@ from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from rest_framework import parsers
 
 from accounts.models import User
+from app import http_client
+from app.http_client import CircuitOpenError
 from accounts.renderers import UserRenderer
+from accounts.revocation import RevocableRefreshToken, revoke
+from accounts.throttling import AuthEmailRateThrottle, AuthIPRateThrottle
 from accounts.serializers import (
     UserChangePasswordSerializer,
     UserLoginResponseSerializer,
@@ -33,6 +40,8 @@ from accounts.serializers import (
 # from django.shortcuts import render
 logger = logging.getLogger(__name__)
 
+GOOGLE_USERINFO_URL = "https://www.googleapis.com/oauth2/v2/userinfo"
+
 
 # Generate token Manually
 class TokenUtility:
@@ -81,6 +90,8 @@ class TokenUtility:
 # Registering the user directly log in the user
 class UserRegistrationView(APIView):
     renderer_classes = [UserRenderer]
+    throttle_classes = [AuthIPRateThrottle, AuthEmailRateThrottle]
+    throttle_scope = "register"
 
     @extend_schema(
         request=UserRegistrationSerializer,
@@ -109,11 +120,7 @@ class UserRegistrationView(APIView):
         """
         serializer = UserRegistrationSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = serializer.save()  # returns the user instance
-
-        # optionally set login_method if not done in serializer
-        user.login_method = "local"
-        user.save(update_fields=["login_method"])
+        user = serializer.save()  # returns the user instance, login_method is set by the serializer
 
         token = TokenUtility.get_tokens_for_user(user=user)
 
@@ -126,6 +133,8 @@ class UserRegistrationView(APIView):
 # Login the user and generate JWT token
 class UserLoginView(APIView):
     renderer_classes = [UserRenderer]
+    throttle_classes = [AuthIPRateThrottle, AuthEmailRateThrottle]
+    throttle_scope = "login"
 
     @extend_schema(
         request=UserLoginSerializer,
@@ -211,7 +220,7 @@ class UserLogOutView(APIView):
     @extend_schema(tags=["auth"])
     def post(self, request):
         """
-        Logs out the authenticated user by blacklisting their refresh token.
+        Logs out the authenticated user by revoking their refresh token and the access token of the request.
         :param request: HTTP POST request containing the 'refresh_token' in the body.
         :return: JSON response confirming logout or detailing an error.
                  Success Example:
@@ -233,8 +242,10 @@ class UserLogOutView(APIView):
             )
 
         try:
-            token_obj = RefreshToken(refresh_token)
+            token_obj = RevocableRefreshToken(refresh_token)
             token_obj.blacklist()
+            if request.auth is not None:
+                revoke(request.auth)
             return Response(
                 {"msg": "Logged out successfully."},
                 status=status.HTTP_200_OK,
@@ -250,6 +261,8 @@ class UserLogOutView(APIView):
 class UserChangePasswordView(APIView):
     renderer_classes = [UserRenderer]
     permission_classes = [IsAuthenticated]
+    throttle_classes = [AuthIPRateThrottle, AuthEmailRateThrottle]
+    throttle_scope = "change_password"
 
     @extend_schema(request=UserChangePasswordSerializer, tags=["auth"])
     def post(self, request):
@@ -345,10 +358,11 @@ class CallbackHandleView(APIView):
             )
 
         # Use the access token to retrieve user information from Google
-        user_info_response = requests.get(
-            f"https://www.googleapis.com/oauth2/v2/userinfo?access_token={access_token}"
-        )
-        user_info = user_info_response.json()
+        try:
+            user_info_response = http_client.get(GOOGLE_USERINFO_URL, params={"access_token": access_token})
+            user_info = user_info_response.json()
+        except (requests.RequestException, CircuitOpenError, ValueError):
+            user_info = {}
 
         # Extract the email and name from the user information
         email = user_info.get("email", None)
@@ -376,3 +390,41 @@ class CallbackHandleView(APIView):
         return Response(
             {"token": jwt_token, "msg": "Success"}, status=status.HTTP_200_OK
         )
+
+
+async def google_callback_async_view(request):
+    """
+    Async twin of CallbackHandleView, the Google userinfo call awaits instead of blocking a worker
+    """
+    access_token = request.GET.get("access_token")
+    if access_token is None:
+        return JsonResponse({"error": "Invaid request."}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        user_info_response = await http_client.aget(GOOGLE_USERINFO_URL, params={"access_token": access_token})
+        user_info = user_info_response.json()
+    except (httpx.HTTPError, CircuitOpenError, ValueError):
+        user_info = {}
+
+    email = user_info.get("email", None)
+    name = user_info.get("name", None)
+    if not email or not name:
+        return JsonResponse(
+            {"error": "Failed to get data from Google user info."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    user, created = await User.objects.aget_or_create(
+        email=email,
+        defaults={
+            "name": name,
+            "login_method": "google_login",
+            "last_verified_identity": datetime.datetime.now(),
+        },
+    )
+    if not created:
+        user.last_verified_identity = datetime.datetime.now()
+        await user.asave()
+
+    jwt_token = await sync_to_async(TokenUtility.get_tokens_for_user)(user)
+    return JsonResponse({"token": jwt_token, "msg": "Success"}, status=status.HTTP_200_OK)
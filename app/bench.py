@@ -0,0 +1,70 @@
+"""
+Helpers shared by the `bench_*` management commands: timing, percentiles and the result table.
+"""
+
+import time
+
+
+def timed(func, *args, **kwargs):
+    """
+    :return: (result, elapsed seconds) of one call
+    """
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def best_of(func, repeat=5):
+    """
+    :return: the fastest of `repeat` calls in seconds, the least disturbed run is the closest to the real cost
+    """
+    return min(timed(func)[1] for _ in range(repeat))
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarize(name, latencies, duration=None, errors=0):
+    """
+    One result row from a list of per operation latencies in seconds
+    :param duration: wall clock seconds the operations ran for, adds the rate
+    """
+    values = sorted(latencies)
+    row = {
+        "name": name,
+        "ops": len(values),
+        "errors": errors,
+        "p50_ms": percentile(values, 0.5) * 1000,
+        "p99_ms": percentile(values, 0.99) * 1000,
+        "max_ms": values[-1] * 1000 if values else float("nan"),
+    }
+    if duration:
+        row["ops_s"] = len(values) / duration
+    return row
+
+
+def format_table(rows):
+    """
+    Renders result rows (dicts with the same keys) as an aligned text table
+    """
+    if not rows:
+        return ""
+    columns = list(rows[0])
+    cells = [[_cell(row.get(column)) for column in columns] for row in rows]
+    widths = [max(len(column), *(len(line[index]) for line in cells)) for index, column in enumerate(columns)]
+    lines = ["  ".join(column.ljust(width) for column, width in zip(columns, widths))]
+    lines += ["  ".join(value.ljust(width) for value, width in zip(line, widths)) for line in cells]
+    return "\n".join(lines)
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    if isinstance(value, int):
+        return f"{value:,}"
+    return str(value)
@@ -0,0 +1,37 @@
+"""
+SQLite backend tuned for a web app that serves reads while ingestion tasks write.
+
+Adds two keys to the database OPTIONS:
+
+- `pragmas`: PRAGMA name -> value, applied to every new connection (journal mode, sync level, caches)
+- `transaction_mode`: `DEFERRED` (SQLite's default), `IMMEDIATE` or `EXCLUSIVE`. With `IMMEDIATE`
+  an atomic block takes the write lock when it starts, so it waits up to `busy_timeout` for a
+  concurrent writer instead of failing with "database is locked" when its first write needs to
+  upgrade a read lock. Django 5.1 supports this option natively.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ("DEFERRED", "IMMEDIATE", "EXCLUSIVE")
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # not sqlite3.connect() arguments
+        self.pragmas = params.pop("pragmas", {})
+        self.transaction_mode = (params.pop("transaction_mode", None) or "DEFERRED").upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f"transaction_mode must be one of {', '.join(TRANSACTION_MODES)}")
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f"BEGIN {self.transaction_mode}")
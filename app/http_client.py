@@ -0,0 +1,288 @@
+"""
+Shared clients for outbound HTTP calls.
+
+Every integration goes through `get` (sync, pooled `requests.Session`) or `aget` (async, pooled
+`httpx.AsyncClient`). Both keep connections alive per host, retry idempotent calls with jittered
+exponential backoff, stop calling a host whose circuit is open and record per-host latency and errors.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+# connections kept open per client, bounds the upstream calls one process has in flight
+MAX_CONNECTIONS = 200
+MAX_KEEPALIVE_CONNECTIONS = 50
+
+# hosts whose connection pools the sync session keeps
+POOL_HOSTS = 10
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# extra attempts after the first one, only for connection errors, timeouts and RETRY_STATUSES
+MAX_RETRIES = 2
+RETRY_STATUSES = {429, 502, 503, 504}
+BACKOFF_BASE = 0.2
+BACKOFF_CAP = 5.0
+
+# consecutive failures that open a host's circuit, and how long it stays open before a trial call
+BREAKER_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30
+
+# upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+DEFAULT_HEADERS = {"Accept-Encoding": "gzip, deflate"}
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a host whose circuit breaker is open
+    """
+
+    def __init__(self, host, retry_after):
+        super().__init__(f"Circuit open for {host}, retry in {retry_after:.0f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Per-host breaker: closed -> open after `threshold` consecutive failures -> half open once
+    `reset_timeout` elapsed, where a single trial call closes it again or re-opens it.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def before_call(self, host):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            waited = time.monotonic() - self.opened_at
+            if waited < self.reset_timeout or self.trial:
+                raise CircuitOpenError(host, max(self.reset_timeout - waited, 0))
+            self.trial = True
+
+    def release(self):
+        """
+        Ends a call that neither succeeded nor failed (e.g. cancelled), a pending trial can run again
+        """
+        with self.lock:
+            self.trial = False
+
+    def record(self, ok):
+        with self.lock:
+            self.trial = False
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = defaultdict(int)
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total_ms = 0.0
+
+    def observe(self, elapsed_ms, error=None):
+        self.requests += 1
+        self.total_ms += elapsed_ms
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS) if elapsed_ms <= bound), len(LATENCY_BUCKETS))
+        self.buckets[index] += 1
+        if error:
+            self.errors[error] += 1
+
+
+_breakers = defaultdict(CircuitBreaker)
+_stats = defaultdict(HostStats)
+_stats_lock = threading.Lock()
+
+
+def _host(url):
+    return urlsplit(url).netloc
+
+
+def _backoff(attempt):
+    # full jitter, spreads the retries of concurrent callers
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def _observe(host, started, error=None, retry=False):
+    with _stats_lock:
+        stats = _stats[host]
+        stats.observe((time.perf_counter() - started) * 1000, error)
+        if retry:
+            stats.retries += 1
+
+
+def _status_error(status_code):
+    return f"http_{status_code // 100}xx" if status_code >= 400 else None
+
+
+def http_stats():
+    """
+    :return: per host request count, retries, errors, mean latency, latency histogram and breaker state
+    """
+    with _stats_lock:
+        return {
+            host: {
+                "requests": stats.requests,
+                "retries": stats.retries,
+                "errors": dict(stats.errors),
+                "mean_ms": round(stats.total_ms / stats.requests, 2) if stats.requests else None,
+                "latency_ms": {
+                    **{f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS, stats.buckets)},
+                    "inf": stats.buckets[-1],
+                },
+                "circuit": _breakers[host].state,
+            }
+            for host, stats in _stats.items()
+        }
+
+
+_sessions = {}
+
+
+def get_session():
+    """
+    Returns the keep-alive `requests.Session` of this process, forked workers build their own pools
+    """
+    pid = os.getpid()
+    session = _sessions.get(pid)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        # retries are handled by `get`, so that they go through the backoff and the breaker
+        adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=MAX_KEEPALIVE_CONNECTIONS, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _sessions.clear()
+        _sessions[pid] = session
+    return session
+
+
+def get(url, params=None, timeout=DEFAULT_TIMEOUT, retries=MAX_RETRIES, **kwargs):
+    """
+    GET on the pooled session with retries, backoff and the host's circuit breaker.
+    :param kwargs: passed to `requests.Session.get`, e.g. `stream=True`
+    :return: the `requests.Response`, non retryable error statuses are returned as is
+    :raise CircuitOpenError: the host is failing, no call was made
+    :raise requests.RequestException: the last connection error or timeout once retries are exhausted
+    """
+    host = _host(url)
+    breaker = _breakers[host]
+    for attempt in range(retries + 1):
+        breaker.before_call(host)
+        last = attempt == retries
+        started = time.perf_counter()
+        try:
+            response = get_session().get(url, params=params, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            breaker.record(False)
+            _observe(host, started, type(e).__name__, retry=not last)
+            if last:
+                raise
+            time.sleep(_backoff(attempt))
+            continue
+        except BaseException as e:
+            # e.g. ContentDecodingError or TooManyRedirects, must not leave a half open trial pending forever
+            breaker.record(False)
+            _observe(host, started, type(e).__name__)
+            raise
+
+        breaker.record(response.status_code < 500)
+        retry = response.status_code in RETRY_STATUSES and not last
+        _observe(host, started, _status_error(response.status_code), retry=retry)
+        if not retry:
+            return response
+        response.close()
+        time.sleep(_backoff(attempt))
+
+
+# httpx clients are bound to the event loop they were created on, so one pool per loop
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """
+    Returns the pooled, keep-alive `httpx.AsyncClient` of the running event loop
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            timeout=httpx.Timeout(DEFAULT_TIMEOUT[1], connect=DEFAULT_TIMEOUT[0]),
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def aget(url, params=None, retries=MAX_RETRIES, **kwargs):
+    """
+    Async twin of `get` on the event loop's pooled client, shares its breakers and stats.
+    :raise CircuitOpenError: the host is failing, no call was made
+    :raise httpx.TransportError: the last connection error or timeout once retries are exhausted
+    """
+    host = _host(url)
+    breaker = _breakers[host]
+    for attempt in range(retries + 1):
+        breaker.before_call(host)
+        last = attempt == retries
+        started = time.perf_counter()
+        try:
+            response = await get_async_client().get(url, params=params, **kwargs)
+        except httpx.TransportError as e:
+            breaker.record(False)
+            _observe(host, started, type(e).__name__, retry=not last)
+            if last:
+                raise
+            await asyncio.sleep(_backoff(attempt))
+            continue
+        except asyncio.CancelledError:
+            # the caller went away (e.g. the ASGI client disconnected), says nothing about the host
+            breaker.release()
+            raise
+        except BaseException as e:
+            breaker.record(False)
+            _observe(host, started, type(e).__name__)
+            raise
+
+        breaker.record(response.status_code < 500)
+        retry = response.status_code in RETRY_STATUSES and not last
+        _observe(host, started, _status_error(response.status_code), retry=retry)
+        if not retry:
+            return response
+        await asyncio.sleep(_backoff(attempt))
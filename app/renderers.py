@@ -0,0 +1,46 @@
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib encoder is used without it
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed, straight to bytes.
+
+    Falls back to DRF's stdlib encoding for indented output (browsable API, `; indent=` media types),
+    without orjson, and for values orjson cannot encode even through DRF's encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # same strict javascript subset escaping as JSONRenderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+def json_bytes(data):
+    """
+    Compact JSON of `data` as bytes, with orjson when it is installed, for code that encodes outside a renderer
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=JSONEncoder().default)
+        except TypeError:
+            pass
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":")).encode()
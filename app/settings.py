@@ -13,6 +13,9 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 from datetime import timedelta
 
+from celery.schedules import crontab
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -88,12 +91,115 @@ WSGI_APPLICATION = "app.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# DATABASE_PROFILE picks the backend: "sqlite" (default) or "postgres". Both keep connections open for
+# DATABASE_CONN_MAX_AGE seconds and check them before reuse.
+
+DATABASE_PROFILE = os.environ.get("DATABASE_PROFILE", "sqlite")
+DATABASE_CONN_MAX_AGE = int(os.environ.get("DATABASE_CONN_MAX_AGE", 60))
+
+if DATABASE_PROFILE == "postgres":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("POSTGRES_DB", "app"),
+            "USER": os.environ.get("POSTGRES_USER", "postgres"),
+            "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+            "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
+            "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+            "CONN_MAX_AGE": DATABASE_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {"connect_timeout": 5},
+        }
+    }
+elif DATABASE_PROFILE == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "app.db.sqlite3",
+            "NAME": os.environ.get("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+            "CONN_MAX_AGE": DATABASE_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                # atomic blocks wait for the write lock up front instead of failing on a lock upgrade
+                "transaction_mode": "IMMEDIATE",
+                "pragmas": {
+                    # readers no longer wait for the ingestion writes and vice versa
+                    "journal_mode": "WAL",
+                    # WAL stays consistent with NORMAL, only the last commits can be lost on power loss
+                    "synchronous": "NORMAL",
+                    # ms a connection waits for the write lock before "database is locked", longer than the
+                    # ingestion's ticker transaction (~3 s alone, ~16 s on a saturated core, see bench_database)
+                    # and shorter than gunicorn's 30 s worker timeout
+                    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT", 20000)),
+                    # bytes of the file read through mmap, and page cache size (negative: KiB) per connection
+                    "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+                    "cache_size": -int(os.environ.get("SQLITE_CACHE_KIB", 64 * 1024)),
+                    "temp_store": "MEMORY",
+                },
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured("DATABASE_PROFILE must be sqlite or postgres")
+
+
+# Cache
+# locmem by default, set REDIS_CACHE_URL to share the cache (ticker responses, locks, counters) between processes.
+# Without it the Celery worker's invalidations never reach the web processes, so the caches that depend on
+# them are bypassed (CACHE_SHARED)
+
+REDIS_CACHE_URL = os.environ.get("REDIS_CACHE_URL")
+if REDIS_CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_CACHE_URL,
+        }
     }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
+CACHE_SHARED = bool(REDIS_CACHE_URL)
+
+
+# Password hashing
+# PASSWORD_HASHER picks the algorithm of new hashes, the costs are tuned to a target latency with
+# `python manage.py calibrate_password_hasher`. Hashes made by another listed hasher or with other costs
+# still verify and are re-encoded with the current policy on the next successful login.
+
+PASSWORD_HASHER = os.environ.get("PASSWORD_HASHER", "pbkdf2")
+
+
+def _env_int(name):
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+# unset costs keep Django's defaults (PBKDF2 600000 iterations, scrypt 2**14 / 8 / 1, argon2 2 / 100 MiB / 8),
+# operators set the values `calibrate_password_hasher` prints for their hardware
+PASSWORD_HASH_PBKDF2_ITERATIONS = _env_int("PASSWORD_HASH_PBKDF2_ITERATIONS")
+PASSWORD_HASH_SCRYPT_WORK_FACTOR = _env_int("PASSWORD_HASH_SCRYPT_WORK_FACTOR")
+PASSWORD_HASH_SCRYPT_BLOCK_SIZE = _env_int("PASSWORD_HASH_SCRYPT_BLOCK_SIZE")
+PASSWORD_HASH_SCRYPT_PARALLELISM = _env_int("PASSWORD_HASH_SCRYPT_PARALLELISM")
+# argon2id, the memory cost is in KiB
+PASSWORD_HASH_ARGON2_TIME_COST = _env_int("PASSWORD_HASH_ARGON2_TIME_COST")
+PASSWORD_HASH_ARGON2_MEMORY_COST = _env_int("PASSWORD_HASH_ARGON2_MEMORY_COST")
+PASSWORD_HASH_ARGON2_PARALLELISM = _env_int("PASSWORD_HASH_ARGON2_PARALLELISM")
+
+_PASSWORD_HASHERS = {
+    "pbkdf2": "accounts.hashers.TunedPBKDF2PasswordHasher",
+    "scrypt": "accounts.hashers.TunedScryptPasswordHasher",
+    "argon2": "accounts.hashers.TunedArgon2PasswordHasher",
 }
+PASSWORD_HASHERS = [
+    _PASSWORD_HASHERS[PASSWORD_HASHER],
+    *(hasher for name, hasher in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER),
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+]
 
 
 # Password validation
@@ -144,10 +250,22 @@ AUTH_USER_MODEL = "accounts.User"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication"
+        "accounts.authentication.RevocableJWTAuthentication"
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10  # You can change this to any default page size
+    'PAGE_SIZE': 10,  # You can change this to any default page size
+    "DEFAULT_RENDERER_CLASSES": [
+        "app.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    # login / register / change-password attempts, checked before any password hashing
+    "DEFAULT_THROTTLE_RATES": {
+        "auth_ip": os.environ.get("AUTH_IP_THROTTLE_RATE", "30/min"),
+        "auth_email": os.environ.get("AUTH_EMAIL_THROTTLE_RATE", "10/min"),
+    },
+    # reverse proxies in front of the app, the client IP of the throttles is taken from X-Forwarded-For only
+    # that many hops deep. 0 uses REMOTE_ADDR, a header the client sets itself is never trusted
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", 0)),
 }
 
 # Custom setting for controlling token expiration
@@ -168,8 +286,13 @@ SIMPLE_JWT = {
     "TOKEN_TYPE_CLAIM": "token_type",
     "TOKEN_USER_CLASS": "rest_framework_simplejwt.models.TokenUser",
     "JTI_CLAIM": "jti",
+    "TOKEN_REFRESH_SERIALIZER": "accounts.serializers.RevocableTokenRefreshSerializer",
 }
 
+# revoked token ids live in the cache, it is the authoritative store only when shared by every process,
+# otherwise refresh tokens fall back to the blacklist table and access tokens are revoked per process
+TOKEN_REVOCATION_CACHE_SHARED = CACHE_SHARED
+
 # needed for reset password
 PASSWORD_RESET_TIMEOUT = 900  # 900 sec=15 min
 
@@ -193,6 +316,38 @@ CELERY_TASK_SERIALIZER = 'json'
 # Celery Beat
 INSTALLED_APPS += ['django_celery_beat']
 
+# Weather snapshot: refreshed in the background every WEATHER_REFRESH_INTERVAL seconds, requests
+# never get a snapshot older than WEATHER_MAX_STALENESS seconds
+WEATHER_REFRESH_INTERVAL = int(os.environ.get("WEATHER_REFRESH_INTERVAL", 60))
+WEATHER_MAX_STALENESS = int(os.environ.get("WEATHER_MAX_STALENESS", 600))
+
+CELERY_BEAT_SCHEDULE = {
+    "refresh-weather": {
+        "task": "weather.tasks.refresh_weather",
+        "schedule": WEATHER_REFRESH_INTERVAL,
+    },
+}
+
+# Intraday ticker snapshots, 0 disables the snapshot task
+COINS_SNAPSHOT_INTERVAL = int(os.environ.get("COINS_SNAPSHOT_INTERVAL", 0))  # seconds
+# raw snapshots older than this are rolled up into hourly bars and deleted
+COINS_SNAPSHOT_RETENTION = timedelta(days=int(os.environ.get("COINS_SNAPSHOT_RETENTION_DAYS", 2)))
+# hourly bars older than this are deleted, daily history lives in the Ticker table
+COINS_BAR_RETENTION = timedelta(days=int(os.environ.get("COINS_BAR_RETENTION_DAYS", 90)))
+
+if COINS_SNAPSHOT_INTERVAL:
+    # registered like the weather refresh so the default beat scheduler runs them
+    CELERY_BEAT_SCHEDULE.update({
+        "ticker-snapshots": {
+            "task": "coins.fetch_tickers.fetch_and_store_ticker_snapshots",
+            "schedule": COINS_SNAPSHOT_INTERVAL,
+        },
+        "ticker-snapshot-rollup": {
+            "task": "coins.fetch_tickers.rollup_ticker_snapshots",
+            "schedule": crontab(minute=5),
+        },
+    })
+
 TEMPLATES[0]['DIRS'] = [BASE_DIR / "templates"]
 
 
@@ -31,6 +31,7 @@ from drf_spectacular.views import (
 from django.conf import settings
 from django.conf.urls.static import static
 
+from app.views import HttpClientStatsAPIView
 from coins.views import coin_chart_view
 
 urlpatterns = [
@@ -46,7 +47,8 @@ urlpatterns = [
     ),
     path("api/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
     path("api/", include("weather.urls")),
-    path("api/", include("coins.urls"))
+    path("api/", include("coins.urls")),
+    path("api/http-stats/", HttpClientStatsAPIView.as_view(), name="http-stats"),
 ]
 
 urlpatterns += [
@@ -0,0 +1,19 @@
+from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from app.http_client import http_stats
+
+
+class HttpClientStatsAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Get Outbound HTTP Stats",
+        description="Returns per upstream host request and retry counts, error counters, a latency histogram "
+                    "and the circuit breaker state of this process.",
+        responses={200: dict},
+    )
+    def get(self, request):
+        return Response(http_stats())
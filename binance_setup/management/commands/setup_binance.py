@@ -2,7 +2,7 @@ from django.core.management.base import BaseCommand
 from datetime import date
 from django.db import connection
 from coins.models import Ticker
-from coins.fetch_tickers import fetch_and_store_ticker_data
+from coins.fetch_tickers import request_ticker_fetch
 
 # only import beat models if the tables exist
 def beat_tables_ready():
@@ -18,8 +18,10 @@ class Command(BaseCommand):
 
     def handle(self, *args, **kwargs):
         if not Ticker.objects.filter(fetched_at=date.today()).exists():
-            fetch_and_store_ticker_data.delay()
-            self.stdout.write("✅ Task triggered for today.")
+            if request_ticker_fetch():
+                self.stdout.write("✅ Task triggered for today.")
+            else:
+                self.stdout.write("⚠️ A fetch for today is already in flight.")
 
         if beat_tables_ready():
             from django_celery_beat.models import PeriodicTask, CrontabSchedule
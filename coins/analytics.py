@@ -0,0 +1,69 @@
+from decimal import Context, Decimal
+
+from django.db.models import Avg, Count, Max, Min, Q, Sum
+
+from .models import Ticker
+from .serializers import format_decimal
+
+QUOTE_ASSETS = ("USDT", "BTC", "ETH")
+
+MOVER_FIELDS = ("symbol", "last_price", "price_change_percent", "quote_volume")
+
+# the aggregated fields' decimal places, sums of max_digits values need a wider context than the default 28 digits
+AGGREGATE_QUANTUM = Decimal(1).scaleb(-Ticker._meta.get_field("price_change_percent").decimal_places)
+AGGREGATE_CONTEXT = Context(prec=2 * Ticker._meta.get_field("price_change_percent").max_digits)
+
+
+def latest_fetch_date():
+    return Ticker.objects.aggregate(latest=Max("fetched_at"))["latest"]
+
+
+def _rows(queryset):
+    return [
+        {field: format_decimal(value) for field, value in row.items()}
+        for row in queryset.values(*MOVER_FIELDS)
+    ]
+
+
+def top_movers(fetched_at, direction, limit):
+    """
+    Top `limit` gainers or losers by `price_change_percent`
+    """
+    ordering = "-price_change_percent" if direction == "gainers" else "price_change_percent"
+    # a symbol without a value has no rank, the filter keeps the (fetched_at, price_change_percent) index usable
+    queryset = Ticker.objects.filter(fetched_at=fetched_at, price_change_percent__isnull=False)
+    return _rows(queryset.order_by(ordering)[:limit])
+
+
+def volume_leaders(fetched_at, limit):
+    """
+    Top `limit` symbols by `quote_volume`
+    """
+    queryset = Ticker.objects.filter(fetched_at=fetched_at, quote_volume__isnull=False)
+    return _rows(queryset.order_by("-quote_volume")[:limit])
+
+
+def quote_asset_summary(fetched_at):
+    """
+    Pair count, traded quote volume and price change stats per quote asset, computed in a single query
+    """
+    aggregates = {}
+    for quote in QUOTE_ASSETS:
+        pairs = Q(symbol__endswith=quote)
+        aggregates.update({
+            f"{quote}__pairs": Count("id", filter=pairs),
+            f"{quote}__quote_volume": Sum("quote_volume", filter=pairs),
+            f"{quote}__avg_price_change_percent": Avg("price_change_percent", filter=pairs),
+            f"{quote}__max_price_change_percent": Max("price_change_percent", filter=pairs),
+            f"{quote}__min_price_change_percent": Min("price_change_percent", filter=pairs),
+        })
+    row = Ticker.objects.filter(fetched_at=fetched_at).aggregate(**aggregates)
+
+    summary = {quote: {} for quote in QUOTE_ASSETS}
+    for key, value in row.items():
+        quote, metric = key.split("__", 1)
+        if isinstance(value, Decimal):
+            # SQLite aggregates come back as float derived Decimals, render them like the stored fields
+            value = value.quantize(AGGREGATE_QUANTUM, context=AGGREGATE_CONTEXT)
+        summary[quote][metric] = format_decimal(value)
+    return summary
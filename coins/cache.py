@@ -0,0 +1,73 @@
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+
+# ticker data only changes when an ingestion commits, which bumps the generation of its scope,
+# so entries never need a TTL to stay correct; the timeout only evicts retired generations
+RESPONSE_CACHE_TIMEOUT = 24 * 60 * 60
+
+# "tickers" covers the daily Ticker table, "snapshots" the intraday snapshots and bars
+SCOPES = ("tickers", "snapshots")
+
+STATS_KEYS = {"hits": "coins:cache:hits", "misses": "coins:cache:misses"}
+
+
+def _generation_key(scope):
+    return f"coins:generation:{scope}"
+
+
+def get_generation(scope):
+    return cache.get_or_set(_generation_key(scope), 1, None)
+
+
+def _incr(key, initial):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # the counter is missing or was evicted
+        cache.add(key, initial, None)
+        cache.incr(key)
+
+
+def bump_generation(scope):
+    """
+    Retires every response cached for `scope`, called once an ingestion has committed
+    """
+    _incr(_generation_key(scope), 1)
+
+
+def _count(stat):
+    _incr(STATS_KEYS[stat], 0)
+
+
+def cached_response_data(endpoint, compute, scopes=("tickers",), **parts):
+    """
+    Read-through cache for serialized response data.
+    :param endpoint: name of the endpoint the data belongs to
+    :param compute: callable building the data on a miss
+    :param scopes: ingestion scopes the data is derived from
+    :param parts: everything else the data depends on, e.g. symbol, date and page
+    :return: the cached or freshly computed data
+    """
+    if not settings.CACHE_SHARED:
+        # the ingestion bumps the generations in the Celery worker's own cache, entries here would never expire
+        return compute()
+    generations = ".".join(str(get_generation(scope)) for scope in scopes)
+    key = f"coins:response:{endpoint}:{generations}:{urlencode(sorted(parts.items()))}"
+    data = cache.get(key)
+    if data is None:
+        _count("misses")
+        data = compute()
+        cache.set(key, data, RESPONSE_CACHE_TIMEOUT)
+    else:
+        _count("hits")
+    return data
+
+
+def cache_stats():
+    stats = cache.get_many(STATS_KEYS.values())
+    result = {stat: stats.get(key, 0) for stat, key in STATS_KEYS.items()}
+    result["shared"] = settings.CACHE_SHARED
+    result["generations"] = {scope: get_generation(scope) for scope in SCOPES}
+    return result
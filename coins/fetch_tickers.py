@@ -1,49 +1,458 @@
 # binance/tasks.py
 
+import codecs
+import json
+import logging
+import tempfile
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+from itertools import groupby
+from time import perf_counter
+
 from celery import shared_task
-import requests
-from datetime import date
-from .models import Ticker
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, transaction
+from django.utils import timezone
 
+from app import http_client
 
-@shared_task
-def fetch_and_store_ticker_data():
-    today = date.today()
-    url = "https://api.binance.com/api/v3/ticker/24hr"
-    response = requests.get(url)
+from .cache import bump_generation
+from .models import Ticker, TickerBar, TickerFetchLock, TickerSnapshot
+from .series import append_series_points
+
+logger = logging.getLogger(__name__)
+
+TICKER_URL = "https://api.binance.com/api/v3/ticker/24hr"
+
+# (connect, read) seconds, the read timeout applies between socket reads of the streamed payload
+TICKER_TIMEOUT = (3.05, 30)
+
+# rows per INSERT statement, keeps us well below SQLite's variable limit
+BATCH_SIZE = 500
+
+# bytes read from the socket at a time when streaming the payload
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# bytes of parsed payload kept in memory before the spool moves to a temporary file
+SPOOL_MEMORY_SIZE = 4 * 1024 * 1024
+
+# how long a dispatched fetch may hold the single-flight lock before another one can start
+FETCH_LOCK_TIMEOUT = 10 * 60
+
+# seconds the series step releases the write lock for between two batches
+SERIES_BATCH_PAUSE = 0.1
+
+# what the series step needs of a stored ticker
+SeriesPoint = namedtuple("SeriesPoint", ["symbol", "last_price", "price_change_percent"])
+
+# insignificant whitespace between JSON tokens
+JSON_WHITESPACE = " \t\r\n"
+
+# characters that can follow a prefix of a JSON number within the same number
+NUMBER_CONTINUATION = "0123456789.eE+-"
+
+# model field -> key in the Binance 24hr payload
+TICKER_FIELDS = {
+    "price_change": "priceChange",
+    "price_change_percent": "priceChangePercent",
+    "weighted_avg_price": "weightedAvgPrice",
+    "prev_close_price": "prevClosePrice",
+    "last_price": "lastPrice",
+    "last_qty": "lastQty",
+    "bid_price": "bidPrice",
+    "bid_qty": "bidQty",
+    "ask_price": "askPrice",
+    "ask_qty": "askQty",
+    "open_price": "openPrice",
+    "high_price": "highPrice",
+    "low_price": "lowPrice",
+    "volume": "volume",
+    "quote_volume": "quoteVolume",
+    "open_time": "openTime",
+    "close_time": "closeTime",
+    "first_id": "firstId",
+    "last_id": "lastId",
+    "count": "count",
+}
+
+
+def iter_json_array(chunks):
+    """
+    Incrementally parses a top level JSON array and yields its elements one by one.
+
+    Only the element currently being decoded is kept in memory, so the payload size
+    does not matter. The array must be well formed: elements separated by exactly one
+    comma and nothing but whitespace after the closing bracket.
+    :param chunks: iterable of bytes, e.g. `response.iter_content()`
+    :return: generator of decoded array elements
+    :raise ValueError: on malformed or truncated input
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+    # what the next non whitespace character must be: "[", a "value" (or "]" right after "["),
+    # a "separator" ("," or "]") or nothing at all once the array is "closed"
+    expect = "["
+    first = True
+    exhausted = False
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in JSON_WHITESPACE:
+            pos += 1
+
+        if pos < len(buffer):
+            char = buffer[pos]
+            if expect == "closed":
+                raise ValueError(f"Unexpected data after the JSON array at {char!r}")
+            if expect == "[":
+                if char != "[":
+                    raise ValueError("Expected a JSON array")
+                expect = "value"
+                pos += 1
+                continue
+            if expect == "separator":
+                if char == ",":
+                    expect = "value"
+                elif char == "]":
+                    expect = "closed"
+                else:
+                    raise ValueError(f"Expected ',' or ']' between JSON array elements, got {char!r}")
+                pos += 1
+                continue
+            if char == "]" and first:
+                expect = "closed"
+                pos += 1
+                continue
+            if char in ",]":
+                raise ValueError(f"Expected a JSON array element, got {char!r}")
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise
+            else:
+                # a value touching the end of the buffer, or a number cut right before its fraction or
+                # exponent ("-0" of "-0.5"), may still be incomplete
+                if exhausted or (end < len(buffer) and buffer[end] not in NUMBER_CONTINUATION):
+                    yield element
+                    expect = "separator"
+                    first = False
+                    pos = end
+                    continue
+        elif exhausted:
+            if expect == "closed":
+                return
+            raise ValueError("Unexpected end of JSON array")
+
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            buffer = buffer[pos:] + text_decoder.decode(b"", final=True)
+        else:
+            buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+
+
+def spool_json_array(chunks, max_size=SPOOL_MEMORY_SIZE):
+    """
+    Downloads and parses the whole array before anything is written, so the database write lock is
+    only held for the inserts and not for the transfer.
+
+    The elements are re-encoded one per line into a spool that stays in memory up to `max_size` bytes
+    and then moves to a temporary file. A malformed or truncated payload fails here, before the
+    transaction. The price is the payload on local disk for the duration of the ingestion and a second
+    (cheap) decode of every element.
+    :param chunks: iterable of bytes, e.g. `response.iter_content()`
+    :return: generator of the decoded array elements, read back from the spool
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=max_size)
+    for element in iter_json_array(chunks):
+        spool.write(json.dumps(element, separators=(",", ":")).encode())
+        spool.write(b"\n")
+    spool.seek(0)
+    return _read_spool(spool)
+
+
+def _read_spool(spool):
+    with spool:
+        for line in spool:
+            yield json.loads(line)
+
+
+def build_ticker(item, fetched_at):
+    return Ticker(
+        symbol=item.get("symbol"),
+        fetched_at=fetched_at,
+        **{field: item.get(key) for field, key in TICKER_FIELDS.items()}
+    )
+
+
+def store_tickers(items, fetched_at, upsert=False, batch_size=BATCH_SIZE):
+    """
+    Writes the Binance 24hr ticker items for `fetched_at` in batches inside one transaction, then
+    appends their chart series points in one short transaction per batch.
+
+    Symbols already stored for the day are resolved with a single query up front. By default
+    they are skipped, with `upsert=True` they are overwritten on the (symbol, fetched_at) key.
+    `items` is consumed while the transaction holds the write lock, pass a list or a spool
+    (`spool_json_array`) rather than a live network stream.
+
+    The series are derived data, writing them outside the ticker transaction halves the time the
+    write lock is held in one go. If the process dies in between, `rebuild_ticker_series` restores them.
+    :param items: iterable of ticker dicts as returned by Binance
+    :param fetched_at: the date the rows are stored under
+    :param upsert: update rows that already exist instead of skipping them
+    :param batch_size: number of rows per INSERT statement
+    :return: dict with inserted / updated / skipped counts and elapsed seconds per phase
+    """
+    stats = {
+        "inserted": 0,
+        "updated": 0,
+        "skipped": 0,
+        "timings": {"lookup": 0.0, "build": 0.0, "write": 0.0, "series": 0.0},
+    }
+    timings = stats["timings"]
+    # (symbol, last_price, price_change_percent) of the written rows, for the series step
+    points = []
+
+    def flush(batch):
+        started = perf_counter()
+        if upsert:
+            Ticker.objects.bulk_create(
+                batch,
+                update_conflicts=True,
+                unique_fields=["symbol", "fetched_at"],
+                update_fields=list(TICKER_FIELDS),
+            )
+        else:
+            # ignore_conflicts keeps a concurrent run from failing the whole transaction
+            Ticker.objects.bulk_create(batch, ignore_conflicts=True)
+        points.extend(SeriesPoint(t.symbol, t.last_price, t.price_change_percent) for t in batch)
+        timings["write"] += perf_counter() - started
+
+    with transaction.atomic():
+        started = perf_counter()
+        existing = set(Ticker.objects.filter(fetched_at=fetched_at).values_list("symbol", flat=True))
+        timings["lookup"] = perf_counter() - started
 
-    if response.status_code == 200:
-        data = response.json()
-        count = 0
-        for item in data:
+        seen = set()
+        batch = []
+        started = perf_counter()
+        for item in items:
             symbol = item.get("symbol")
-            if Ticker.objects.filter(symbol=symbol, fetched_at=today).exists():
+            if not symbol or symbol in seen:
+                stats["skipped"] += 1
                 continue
+            seen.add(symbol)
 
-            Ticker.objects.create(
-                symbol=symbol,
-                price_change=item.get("priceChange"),
-                price_change_percent=item.get("priceChangePercent"),
-                weighted_avg_price=item.get("weightedAvgPrice"),
-                prev_close_price=item.get("prevClosePrice"),
+            if symbol in existing:
+                if not upsert:
+                    stats["skipped"] += 1
+                    continue
+                stats["updated"] += 1
+            else:
+                stats["inserted"] += 1
+
+            batch.append(build_ticker(item, fetched_at))
+            if len(batch) >= batch_size:
+                timings["build"] += perf_counter() - started
+                flush(batch)
+                batch = []
+                started = perf_counter()
+        timings["build"] += perf_counter() - started
+
+        if batch:
+            flush(batch)
+
+    try:
+        started = perf_counter()
+        for index in range(0, len(points), batch_size):
+            if index:
+                # SQLite writers waiting on busy_timeout poll every ~100 ms, let them in between batches
+                time.sleep(SERIES_BATCH_PAUSE)
+            with transaction.atomic():
+                append_series_points(points[index:index + batch_size], fetched_at)
+        timings["series"] = perf_counter() - started
+    finally:
+        # after the series as well, the chart responses are cached on the same generation
+        if stats["inserted"] or stats["updated"]:
+            transaction.on_commit(lambda: bump_generation("tickers"))
+
+    return stats
+
+
+def acquire_fetch_lock(fetched_at):
+    """
+    :return: True if the caller now holds the fetch lock of `fetched_at`, a lock held longer than
+             FETCH_LOCK_TIMEOUT is taken over
+    """
+    now = timezone.now()
+    expired = now - timedelta(seconds=FETCH_LOCK_TIMEOUT)
+    # plain read first, while a fetch is in flight its ingestion may hold the database write lock
+    if TickerFetchLock.objects.filter(fetched_at=fetched_at, acquired_at__gte=expired).exists():
+        return False
+    try:
+        try:
+            with transaction.atomic():
+                TickerFetchLock.objects.create(fetched_at=fetched_at, acquired_at=now)
+            return True
+        except IntegrityError:
+            # conditional UPDATE, only one of the callers racing for an expired lock gets a row count
+            stale = TickerFetchLock.objects.filter(fetched_at=fetched_at, acquired_at__lt=expired)
+            return bool(stale.update(acquired_at=now))
+    except OperationalError:
+        # SQLite's write lock is busy ("database is locked"), most likely the ingestion itself, the
+        # caller serves what is stored instead of failing the request
+        logger.warning("Fetch lock for %s not taken, the database is locked", fetched_at)
+        return False
+
+
+def release_fetch_lock(fetched_at):
+    TickerFetchLock.objects.filter(fetched_at=fetched_at).delete()
+
+
+def request_ticker_fetch():
+    """
+    Dispatches `fetch_and_store_ticker_data` to Celery unless a fetch for today is already in flight,
+    so concurrent requests never fetch the same day twice.
+    :return: True if this call dispatched the task
+    """
+    today = date.today()
+    if not acquire_fetch_lock(today):
+        return False
+    try:
+        fetch_and_store_ticker_data.delay()
+    except Exception:
+        logger.exception("Could not dispatch the ticker fetch")
+        release_fetch_lock(today)
+        return False
+    return True
+
+
+@shared_task
+def fetch_and_store_ticker_data(upsert=False, stream=True):
+    """
+    Fetches the Binance 24hr tickers and stores them for today.
+    :param upsert: overwrite the rows already stored for today
+    :param stream: parse the payload incrementally into a spool (`spool_json_array`) instead of loading it
+                   with `response.json()`
+    """
+    today = date.today()
+    try:
+        with http_client.get(TICKER_URL, stream=stream, timeout=TICKER_TIMEOUT) as response:
+            if response.status_code != 200:
+                return "Failed to fetch data"
+
+            if stream:
+                items = spool_json_array(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+            else:
+                items = response.json()
+        # the payload is fully downloaded and parsed here, the write transaction only covers the inserts
+        stats = store_tickers(items, today, upsert=upsert)
+    finally:
+        release_fetch_lock(today)
+
+    logger.info("Ticker ingestion for %s: %s", today, stats)
+    return (
+        f"{stats['inserted']} tickers saved, {stats['updated']} updated, "
+        f"{stats['skipped']} skipped for {today}"
+    )
+
+
+def store_snapshots(items, ts, batch_size=BATCH_SIZE):
+    """
+    Appends one `TickerSnapshot` per symbol taken at `ts`.
+    :return: number of snapshots written
+    """
+    count = 0
+    batch = []
+    with transaction.atomic():
+        for item in items:
+            if not item.get("symbol"):
+                continue
+            batch.append(TickerSnapshot(
+                symbol=item["symbol"],
+                ts=ts,
                 last_price=item.get("lastPrice"),
-                last_qty=item.get("lastQty"),
-                bid_price=item.get("bidPrice"),
-                bid_qty=item.get("bidQty"),
-                ask_price=item.get("askPrice"),
-                ask_qty=item.get("askQty"),
-                open_price=item.get("openPrice"),
-                high_price=item.get("highPrice"),
-                low_price=item.get("lowPrice"),
-                volume=item.get("volume"),
+                price_change_percent=item.get("priceChangePercent"),
                 quote_volume=item.get("quoteVolume"),
-                open_time=item.get("openTime"),
-                close_time=item.get("closeTime"),
-                first_id=item.get("firstId"),
-                last_id=item.get("lastId"),
-                count=item.get("count"),
-                fetched_at=today
-            )
-            count += 1
-        return f"{count} tickers saved for {today}"
-    return "Failed to fetch data"
+            ))
+            if len(batch) >= batch_size:
+                TickerSnapshot.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            TickerSnapshot.objects.bulk_create(batch)
+            count += len(batch)
+        transaction.on_commit(lambda: bump_generation("snapshots"))
+    return count
+
+
+@shared_task
+def fetch_and_store_ticker_snapshots():
+    """
+    Stores an intraday snapshot of every symbol, scheduled every `COINS_SNAPSHOT_INTERVAL` seconds.
+    """
+    if not settings.COINS_SNAPSHOT_INTERVAL:
+        return "Snapshots disabled"
+
+    ts = timezone.now().replace(microsecond=0)
+    with http_client.get(TICKER_URL, stream=True, timeout=TICKER_TIMEOUT) as response:
+        if response.status_code != 200:
+            return "Failed to fetch data"
+        items = spool_json_array(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+    count = store_snapshots(items, ts)
+    return f"{count} snapshots saved at {ts}"
+
+
+def truncate_hour(ts):
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+@shared_task
+def rollup_ticker_snapshots(batch_size=BATCH_SIZE):
+    """
+    Downsamples snapshots older than `COINS_SNAPSHOT_RETENTION` into hourly bars, deletes the rolled up
+    snapshots and drops bars older than `COINS_BAR_RETENTION`.
+    """
+    now = timezone.now()
+    cutoff = truncate_hour(now - settings.COINS_SNAPSHOT_RETENTION)
+    rows = (
+        TickerSnapshot.objects.filter(ts__lt=cutoff)
+        .order_by("symbol", "ts")
+        .values_list("symbol", "ts", "last_price", "price_change_percent", "quote_volume")
+        .iterator(chunk_size=2000)
+    )
+
+    count = 0
+    bars = []
+    with transaction.atomic():
+        for (symbol, hour), group in groupby(rows, key=lambda row: (row[0], truncate_hour(row[1]))):
+            group = list(group)
+            prices = [row[2] for row in group]
+            bars.append(TickerBar(
+                symbol=symbol,
+                ts=hour,
+                open_price=prices[0],
+                high_price=max(prices),
+                low_price=min(prices),
+                close_price=prices[-1],
+                price_change_percent=group[-1][3],
+                quote_volume=group[-1][4],
+            ))
+            if len(bars) >= batch_size:
+                TickerBar.objects.bulk_create(bars, ignore_conflicts=True)
+                count += len(bars)
+                bars = []
+        if bars:
+            TickerBar.objects.bulk_create(bars, ignore_conflicts=True)
+            count += len(bars)
+
+        deleted, _ = TickerSnapshot.objects.filter(ts__lt=cutoff).delete()
+        TickerBar.objects.filter(ts__lt=now - settings.COINS_BAR_RETENTION).delete()
+        transaction.on_commit(lambda: bump_generation("snapshots"))
+
+    return f"{count} hourly bars from {deleted} snapshots"
@@ -0,0 +1,87 @@
+import random
+from datetime import date, timedelta
+from itertools import groupby
+
+from django.core.management.base import BaseCommand
+
+from app.bench import format_table, summarize, timed
+from coins.models import Ticker, TickerSeriesChunk
+from coins.views import get_chart_points
+
+BENCH_SYMBOL_PREFIX = "BENCHCHART"
+# last day of the synthetic histories, far from any real ingestion
+BENCH_LAST_DAY = date(2000, 12, 31)
+
+
+def bench_tickers(symbol, days):
+    price = 100.0
+    tickers = []
+    for offset in range(days, 0, -1):
+        price *= 1 + random.uniform(-0.05, 0.05)
+        tickers.append(Ticker(
+            symbol=symbol, fetched_at=BENCH_LAST_DAY - timedelta(days=offset - 1),
+            last_price=f"{price:.8f}", price_change_percent=f"{random.uniform(-10, 10):.3f}",
+            open_time=1, close_time=2, first_id=1, last_id=2, count=3,
+        ))
+    return tickers
+
+
+def bench_chunks(tickers):
+    # what the ingestion and rebuild_ticker_series keep, one row per symbol and year
+    return [
+        TickerSeriesChunk(
+            symbol=symbol,
+            year=year,
+            points=[[t.fetched_at.isoformat(), t.last_price, f"{float(t.price_change_percent):.8f}"] for t in group],
+        )
+        for (symbol, year), group in groupby(tickers, key=lambda t: (t.symbol, t.fetched_at.year))
+    ]
+
+
+def _model_instances(symbol):
+    # the chart before the precomputed series, every column of every row as a model instance
+    return [
+        {"date": t.fetched_at.isoformat(), "last_price": str(t.last_price), "change": str(t.price_change_percent)}
+        for t in Ticker.objects.filter(symbol=symbol).order_by("fetched_at")
+    ]
+
+
+def _values_list(symbol):
+    # the fallback for symbols without a series yet
+    queryset = Ticker.objects.filter(symbol=symbol).order_by("fetched_at")
+    return list(queryset.values_list("fetched_at", "last_price", "price_change_percent"))
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the daily chart read at several history lengths, from the precomputed series and from the "
+        "Ticker rows. Writes synthetic symbols to the configured database and removes them afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 10])
+        parser.add_argument("--runs", type=int, default=50, help="reads per history length and method")
+
+    def handle(self, *args, **options):
+        rows = []
+        try:
+            for years in options["years"]:
+                symbol = f"{BENCH_SYMBOL_PREFIX}{years}Y"
+                tickers = bench_tickers(symbol, 365 * years)
+                Ticker.objects.bulk_create(tickers, batch_size=500)
+                TickerSeriesChunk.objects.bulk_create(bench_chunks(tickers))
+
+                for name, read in (
+                    ("series", lambda: get_chart_points(symbol)),
+                    ("Ticker values_list", lambda: _values_list(symbol)),
+                    ("Ticker model rows", lambda: _model_instances(symbol)),
+                ):
+                    points = len(read())
+                    latencies = [timed(read)[1] for _ in range(options["runs"])]
+                    rows.append(summarize(f"{years} y, {points} points, {name}", latencies))
+        finally:
+            Ticker.objects.filter(symbol__startswith=BENCH_SYMBOL_PREFIX).delete()
+            TickerSeriesChunk.objects.filter(symbol__startswith=BENCH_SYMBOL_PREFIX).delete()
+
+        self.stdout.write(format_table(rows))
+        self.stdout.write("✅ Chart reads measured.")
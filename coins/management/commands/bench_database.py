@@ -0,0 +1,183 @@
+import multiprocessing
+import random
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+
+from app.bench import format_table, summarize, timed
+
+# day the synthetic tickers are written under, far from any real ingestion
+BENCH_DATE = date(2000, 1, 1)
+BENCH_SYMBOL_PREFIX = "BENCH"
+BENCH_EMAIL = "bench-database@example.invalid"
+
+
+def bench_items(count):
+    return [
+        {
+            "symbol": f"{BENCH_SYMBOL_PREFIX}{index}USDT",
+            "priceChange": "-0.00100000",
+            "priceChangePercent": f"{random.uniform(-10, 10):.3f}",
+            "weightedAvgPrice": "1.00000000",
+            "prevClosePrice": "1.00000000",
+            "lastPrice": f"{random.uniform(0, 100):.8f}",
+            "lastQty": "1.00000000",
+            "bidPrice": "1.00000000",
+            "bidQty": "1.00000000",
+            "askPrice": "1.00000000",
+            "askQty": "1.00000000",
+            "openPrice": "1.00000000",
+            "highPrice": "1.00000000",
+            "lowPrice": "1.00000000",
+            "volume": "1000.00000000",
+            "quoteVolume": f"{random.uniform(0, 1e7):.8f}",
+            "openTime": 1,
+            "closeTime": 2,
+            "firstId": 1,
+            "lastId": 2,
+            "count": 3,
+        }
+        for index in range(count)
+    ]
+
+
+def _loop(name, duration, operation, pause=0.0):
+    """
+    Runs `operation` for `duration` seconds, like a request or a task would: the connection is released
+    between operations, errors are counted and not retried
+    :return: (name, latencies, errors, error messages)
+    """
+    latencies, errors, messages = [], 0, set()
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        close_old_connections()
+        try:
+            latencies.append(timed(operation)[1])
+        except Exception as e:
+            errors += 1
+            messages.add(f"{type(e).__name__}: {e}")
+        close_old_connections()
+        if pause:
+            time.sleep(pause)
+    return name, latencies, errors, sorted(messages)
+
+
+def _ingest(queue, duration, items, pause):
+    from coins.fetch_tickers import store_tickers
+
+    holds = []
+
+    def operation():
+        timings = store_tickers(items, BENCH_DATE, upsert=True)["timings"]
+        # the ticker transaction, the longest the write lock is held in one go
+        holds.append(timings["lookup"] + timings["build"] + timings["write"])
+
+    result = _loop("ingest (store_tickers upsert)", duration, operation, pause=pause)
+    queue.put([result, ("  ticker transaction", holds, 0, [])])
+
+
+def _read(queue, duration, symbols):
+    from coins.models import Ticker
+
+    def operation():
+        list(Ticker.objects.filter(fetched_at=BENCH_DATE, symbol=random.choice(symbols)).values_list("symbol"))
+        queryset = Ticker.objects.filter(fetched_at=BENCH_DATE).order_by("symbol")
+        list(queryset.values_list("symbol", "last_price")[:100])
+
+    queue.put([_loop("read (today listing)", duration, operation)])
+
+
+def _login(queue, duration, user_id, pause):
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from accounts.models import User
+
+    user = User.objects.get(pk=user_id)
+    # the write of a login or registration: RefreshToken.for_user inserts an OutstandingToken
+    queue.put([_loop("write (login token)", duration, lambda: RefreshToken.for_user(user), pause=pause)])
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures reads and small writes (login tokens) while the ticker ingestion rewrites a synthetic day "
+        f"({BENCH_DATE}). Writes to the configured database and removes its rows afterwards, point SQLITE_PATH "
+        "at a copy to keep the real file untouched"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--duration", type=float, default=30, help="seconds every process runs")
+        parser.add_argument("--symbols", type=int, default=12000, help="tickers per ingestion run")
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--writers", type=int, default=2, help="processes issuing login tokens")
+        parser.add_argument("--write-pause", type=float, default=0.05, help="seconds between two logins")
+        parser.add_argument(
+            "--ingest-pause", type=float, default=1,
+            help="seconds between two ingestion runs, 0 rewrites the day back to back (worst case)",
+        )
+
+    def handle(self, *args, **options):
+        from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+        from accounts.models import User
+        from coins.fetch_tickers import store_tickers
+        from coins.models import Ticker, TickerSeriesChunk
+
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise CommandError("The benchmark forks its worker processes, which this platform does not support")
+
+        duration = options["duration"]
+        items = bench_items(options["symbols"])
+        symbols = [item["symbol"] for item in items]
+        user, _ = User.objects.get_or_create(email=BENCH_EMAIL, defaults={"name": "bench"})
+
+        _, seconds = timed(store_tickers, items, BENCH_DATE, upsert=True)
+        self.stdout.write(f"Ingestion alone: {seconds:.2f} s for {len(items)} tickers")
+
+        settings_dict = connections["default"].settings_dict
+        self.stdout.write(
+            f"{settings_dict['ENGINE']}, OPTIONS {settings_dict.get('OPTIONS', {})}, "
+            f"{options['readers']} readers and {options['writers']} writers for {duration:g} s"
+        )
+
+        # forked children must open their own connections
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        processes = [context.Process(target=_ingest, args=(queue, duration, items, options["ingest_pause"]))]
+        processes += [
+            context.Process(target=_read, args=(queue, duration, symbols)) for _ in range(options["readers"])
+        ]
+        processes += [
+            context.Process(target=_login, args=(queue, duration, user.pk, options["write_pause"]))
+            for _ in range(options["writers"])
+        ]
+        try:
+            for process in processes:
+                process.start()
+            results = [queue.get() for _ in processes]
+            for process in processes:
+                process.join()
+        finally:
+            Ticker.objects.filter(fetched_at=BENCH_DATE).delete()
+            TickerSeriesChunk.objects.filter(symbol__startswith=BENCH_SYMBOL_PREFIX).delete()
+            OutstandingToken.objects.filter(user=user).delete()
+            user.delete()
+
+        rows, messages = {}, set()
+        for name, latencies, errors, errors_seen in (result for process in results for result in process):
+            merged = rows.setdefault(name, ([], 0))
+            rows[name] = (merged[0] + latencies, merged[1] + errors)
+            messages.update(errors_seen)
+        self.stdout.write(format_table([
+            summarize(name, latencies, duration, errors) for name, (latencies, errors) in rows.items()
+        ]))
+        for message in sorted(messages):
+            self.stdout.write(f"  error: {message}")
+
+        failed = sum(errors for _, errors in rows.values())
+        if failed:
+            self.stdout.write(f"❌ {failed} operations failed.")
+        else:
+            self.stdout.write("✅ No operation failed.")
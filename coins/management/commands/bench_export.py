@@ -0,0 +1,120 @@
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import User
+from app.bench import format_table
+from coins.models import Ticker
+from coins.views import TickerExportAPIView
+
+BENCH_SYMBOL_PREFIX = "BENCHEXPORT"
+# first day of the generated fixture, far from any real ingestion
+BENCH_FIRST_DAY = date(1990, 1, 1)
+
+
+def generate_fixture(years, symbols, batch_size=2000):
+    """
+    Writes `years` of daily tickers for `symbols` synthetic symbols
+    :return: (first day, last day, rows written)
+    """
+    days = 365 * years
+    names = [f"{BENCH_SYMBOL_PREFIX}{index}" for index in range(symbols)]
+    batch, count = [], 0
+    for offset in range(days):
+        day = BENCH_FIRST_DAY + timedelta(days=offset)
+        for symbol in names:
+            price = f"{random.uniform(0, 1000):.8f}"
+            batch.append(Ticker(
+                symbol=symbol, fetched_at=day,
+                price_change="0.10000000", price_change_percent=f"{random.uniform(-10, 10):.3f}",
+                weighted_avg_price=price, prev_close_price=price, last_price=price, last_qty="1.00000000",
+                bid_price=price, bid_qty="1.00000000", ask_price=price, ask_qty="1.00000000",
+                open_price=price, high_price=price, low_price=price,
+                volume=f"{random.uniform(0, 1e6):.8f}", quote_volume=f"{random.uniform(0, 1e8):.8f}",
+                open_time=1, close_time=2, first_id=1, last_id=2, count=3,
+            ))
+            if len(batch) >= batch_size:
+                Ticker.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+    if batch:
+        Ticker.objects.bulk_create(batch)
+        count += len(batch)
+    return BENCH_FIRST_DAY, BENCH_FIRST_DAY + timedelta(days=days - 1), count
+
+
+def export(params, gzip=True):
+    """
+    Runs the export view and drains its body like a client would
+    :return: (bytes sent, seconds to the first chunk, total seconds)
+    """
+    headers = {"HTTP_ACCEPT_ENCODING": "gzip"} if gzip else {}
+    request = APIRequestFactory().get("/api/tickers/export/", params, **headers)
+    force_authenticate(request, user=User(email="bench-export@example.invalid"))
+    started = time.perf_counter()
+    response = TickerExportAPIView.as_view()(request)
+    if response.status_code != 200:
+        raise RuntimeError(f"export answered {response.status_code}")
+    size, first_chunk = 0, None
+    for chunk in response.streaming_content:
+        if first_chunk is None:
+            first_chunk = time.perf_counter() - started
+        size += len(chunk)
+    return size, first_chunk, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a multi-year ticker fixture and measures the streaming export over it: rows/s, compressed "
+        "size, time to the first chunk and the Python memory peak. Writes to the configured database, point "
+        "SQLITE_PATH at a scratch file"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--years", type=int, default=3)
+        parser.add_argument("--symbols", type=int, default=100, help="symbols per day, 1500 is close to Binance")
+        parser.add_argument("--keep", action="store_true", help="keep the fixture for later runs")
+
+    def handle(self, *args, **options):
+        Ticker.objects.filter(symbol__startswith=BENCH_SYMBOL_PREFIX).delete()
+        started = time.perf_counter()
+        first, last, total = generate_fixture(options["years"], options["symbols"])
+        self.stdout.write(f"Fixture: {total:,} rows from {first} to {last} in {time.perf_counter() - started:.1f} s")
+
+        ranges = (
+            ("full", first, last),
+            ("1 year", last - timedelta(days=364), last),
+            ("1 month", last - timedelta(days=29), last),
+        )
+        rows = []
+        try:
+            for name, start, end in ranges:
+                params = {"start": start.isoformat(), "end": end.isoformat()}
+                count = Ticker.objects.filter(fetched_at__range=(start, end)).count()
+                for export_format in ("csv", "ndjson"):
+                    params["format"] = export_format
+                    size, first_chunk, seconds = export(params)
+                    # separate pass, tracemalloc slows the export down
+                    tracemalloc.start()
+                    export(params)
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                    rows.append({
+                        "name": f"{name}, {export_format}",
+                        "rows": count,
+                        "seconds": seconds,
+                        "rows_s": count / seconds,
+                        "first_chunk_ms": first_chunk * 1000,
+                        "gzip_mb": size / 1e6,
+                        "peak_mb": peak / 1e6,
+                    })
+        finally:
+            if not options["keep"]:
+                Ticker.objects.filter(symbol__startswith=BENCH_SYMBOL_PREFIX).delete()
+
+        self.stdout.write(format_table(rows))
+        self.stdout.write("✅ Export measured, the memory peak should not grow with the range.")
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+
+from app.bench import format_table, summarize, timed
+from coins.fetch_tickers import store_tickers
+from coins.management.commands.bench_database import BENCH_DATE, BENCH_SYMBOL_PREFIX, bench_items
+from coins.models import Ticker, TickerSeriesChunk
+from coins.serializers import TICKER_OUTPUT_FIELDS, TickerSerializer, parse_ticker_fields, ticker_row_mapper
+
+
+def _queryset():
+    return Ticker.objects.filter(fetched_at=BENCH_DATE).order_by("symbol")
+
+
+def serialize(fields=None):
+    # the listing before the row mappers, a model instance per row through the ModelSerializer
+    return TickerSerializer(_queryset(), many=True).data
+
+
+def map_rows(fields):
+    mapper = ticker_row_mapper(fields)
+    return [mapper(row) for row in _queryset().values_list(*fields)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures ticker rows serialized per second, query included, with TickerSerializer and the row mappers "
+        f"over a synthetic day ({BENCH_DATE}). Writes to the configured database and removes its rows afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--symbols", type=int, default=12000, help="rows of the synthetic day")
+        parser.add_argument("--runs", type=int, default=10)
+        parser.add_argument("--fields", default="symbol,last_price", help="sparse fieldset measured as well")
+
+    def handle(self, *args, **options):
+        sparse = parse_ticker_fields(options["fields"])
+        store_tickers(bench_items(options["symbols"]), BENCH_DATE)
+        rows = []
+        try:
+            same = [dict(row) for row in serialize()] == map_rows(TICKER_OUTPUT_FIELDS)
+            for name, func, fields in (
+                ("TickerSerializer", serialize, None),
+                ("mapper, all fields", map_rows, TICKER_OUTPUT_FIELDS),
+                (f"mapper, {','.join(sparse)}", map_rows, sparse),
+            ):
+                latencies = [timed(func, fields)[1] for _ in range(options["runs"])]
+                row = summarize(name, latencies)
+                row["rows_s"] = options["symbols"] / row["p50_ms"] * 1000
+                rows.append(row)
+        finally:
+            Ticker.objects.filter(fetched_at=BENCH_DATE).delete()
+            TickerSeriesChunk.objects.filter(symbol__startswith=BENCH_SYMBOL_PREFIX).delete()
+
+        self.stdout.write(format_table(rows))
+        if same:
+            self.stdout.write("✅ The mapper output matches TickerSerializer.")
+        else:
+            self.stdout.write("❌ The mapper output differs from TickerSerializer.")
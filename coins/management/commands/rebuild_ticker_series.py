@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from coins.series import rebuild_series
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the precomputed daily chart series from the Ticker history"
+
+    def handle(self, *args, **kwargs):
+        count = rebuild_series()
+        self.stdout.write(f"✅ {count} series chunks written.")
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("coins", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TickerSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("symbol", models.CharField(max_length=20)),
+                ("ts", models.DateTimeField()),
+                ("last_price", models.DecimalField(decimal_places=8, max_digits=40)),
+                (
+                    "price_change_percent",
+                    models.DecimalField(decimal_places=8, max_digits=40),
+                ),
+                ("quote_volume", models.DecimalField(decimal_places=8, max_digits=40)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["symbol", "ts"], name="coins_ticke_symbol_605c38_idx"
+                    ),
+                    models.Index(fields=["ts"], name="coins_ticke_ts_3a1e6a_idx"),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="TickerBar",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("symbol", models.CharField(max_length=20)),
+                ("ts", models.DateTimeField()),
+                ("open_price", models.DecimalField(decimal_places=8, max_digits=40)),
+                ("high_price", models.DecimalField(decimal_places=8, max_digits=40)),
+                ("low_price", models.DecimalField(decimal_places=8, max_digits=40)),
+                ("close_price", models.DecimalField(decimal_places=8, max_digits=40)),
+                (
+                    "price_change_percent",
+                    models.DecimalField(decimal_places=8, max_digits=40),
+                ),
+                ("quote_volume", models.DecimalField(decimal_places=8, max_digits=40)),
+            ],
+            options={
+                "ordering": ["symbol", "ts"],
+                "indexes": [
+                    models.Index(fields=["ts"], name="coins_ticke_ts_7dcb53_idx")
+                ],
+                "unique_together": {("symbol", "ts")},
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("coins", "0002_ticker_snapshots"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticker",
+            name="price_change_num",
+            field=models.DecimalField(decimal_places=8, max_digits=40, null=True),
+        ),
+        migrations.AddField(
+            model_name="ticker",
+            name="price_change_percent_num",
+            field=models.DecimalField(decimal_places=8, max_digits=40, null=True),
+        ),
+        migrations.AddField(
+            model_name="ticker",
+            name="weighted_avg_price_num",
+            field=models.DecimalField(decimal_places=8, max_digits=40, null=True),
+        ),
+        migrations.AddField(
+            model_name="ticker",
+            name="prev_close_price_num",
+            field=models.DecimalField(decimal_places=8, max_digits=40, null=True),
+        ),
+        migrations.AddField(
+            model_name="ticker",
+            name="last_price_num",
+            field=models.DecimalField(decimal_places=8, max_digits=40, null=True),
+        ),
+        migrations.AddField(
+            model_name="ticker",
+            name="last_qty_num",
+            field=models.DecimalField(decimal_places=8, max_digits=40, null=True),
+        ),
+        migrations.AddField(
+            model_name="ticker",
+            name="bid_price_num",
+            field=models.DecimalField(decimal_places=8, max_digits=40, null=True),
+        ),
+        migrations.AddField(
+            model_name="ticker",
+            name="bid_qty_num",
+            field=models.DecimalField(decimal_places=8, max_digits=40, null=True),
+        ),
+        migrations.AddField(
+            model_name="ticker",
+            name="ask_price_num",
+            field=models.DecimalField(decimal_places=8, max_digits=40, null=True),
+        ),
+        migrations.AddField(
+            model_name="ticker",
+            name="ask_qty_num",
+            field=models.DecimalField(decimal_places=8, max_digits=40, null=True),
+        ),
+        migrations.AddField(
+            model_name="ticker",
+            name="open_price_num",
+            field=models.DecimalField(decimal_places=8, max_digits=40, null=True),
+        ),
+        migrations.AddField(
+            model_name="ticker",
+            name="high_price_num",
+            field=models.DecimalField(decimal_places=8, max_digits=40, null=True),
+        ),
+        migrations.AddField(
+            model_name="ticker",
+            name="low_price_num",
+            field=models.DecimalField(decimal_places=8, max_digits=40, null=True),
+        ),
+        migrations.AddField(
+            model_name="ticker",
+            name="volume_num",
+            field=models.DecimalField(decimal_places=8, max_digits=40, null=True),
+        ),
+        migrations.AddField(
+            model_name="ticker",
+            name="quote_volume_num",
+            field=models.DecimalField(decimal_places=8, max_digits=40, null=True),
+        ),
+    ]
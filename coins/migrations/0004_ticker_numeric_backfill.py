@@ -0,0 +1,82 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:21
+
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 1000
+
+NUMERIC_FIELDS = [
+    "price_change",
+    "price_change_percent",
+    "weighted_avg_price",
+    "prev_close_price",
+    "last_price",
+    "last_qty",
+    "bid_price",
+    "bid_qty",
+    "ask_price",
+    "ask_qty",
+    "open_price",
+    "high_price",
+    "low_price",
+    "volume",
+    "quote_volume",
+]
+
+
+def to_decimal(value):
+    """
+    The stored text as a Decimal, None (NULL) when it is missing or not a finite number rather than a
+    made-up price
+    """
+    try:
+        number = Decimal(value)
+    except (TypeError, ValueError, InvalidOperation):
+        return None
+    return number if number.is_finite() else None
+
+
+def copy_to_numeric_columns(apps, schema_editor):
+    """
+    Copies the text columns into their numeric shadow columns in primary key ordered batches,
+    each batch commits on its own so the table is never locked for the whole copy.
+    """
+    Ticker = apps.get_model("coins", "Ticker")
+    db_alias = schema_editor.connection.alias
+    numeric_fields = [f"{field}_num" for field in NUMERIC_FIELDS]
+
+    last_id = 0
+    while True:
+        rows = list(
+            Ticker.objects.using(db_alias)
+            .filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", *NUMERIC_FIELDS)[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+
+        batch = []
+        for row in rows:
+            ticker = Ticker(id=row[0])
+            for field, value in zip(numeric_fields, row[1:]):
+                setattr(ticker, field, to_decimal(value))
+            batch.append(ticker)
+
+        with transaction.atomic(using=db_alias):
+            Ticker.objects.using(db_alias).bulk_update(batch, numeric_fields)
+        last_id = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("coins", "0003_ticker_numeric_columns"),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_to_numeric_columns, migrations.RunPython.noop),
+    ]
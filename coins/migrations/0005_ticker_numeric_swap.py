@@ -0,0 +1,151 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:21
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # the numeric columns stay nullable as added in 0003: making them NOT NULL rebuilds the whole table once per
+    # column on SQLite (a full scan under ACCESS EXCLUSIVE per column on Postgres), and 0004 stores the values
+    # that do not parse as NULL
+
+    dependencies = [
+        ("coins", "0004_ticker_numeric_backfill"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="ticker",
+            name="price_change",
+        ),
+        migrations.RenameField(
+            model_name="ticker",
+            old_name="price_change_num",
+            new_name="price_change",
+        ),
+        migrations.RemoveField(
+            model_name="ticker",
+            name="price_change_percent",
+        ),
+        migrations.RenameField(
+            model_name="ticker",
+            old_name="price_change_percent_num",
+            new_name="price_change_percent",
+        ),
+        migrations.RemoveField(
+            model_name="ticker",
+            name="weighted_avg_price",
+        ),
+        migrations.RenameField(
+            model_name="ticker",
+            old_name="weighted_avg_price_num",
+            new_name="weighted_avg_price",
+        ),
+        migrations.RemoveField(
+            model_name="ticker",
+            name="prev_close_price",
+        ),
+        migrations.RenameField(
+            model_name="ticker",
+            old_name="prev_close_price_num",
+            new_name="prev_close_price",
+        ),
+        migrations.RemoveField(
+            model_name="ticker",
+            name="last_price",
+        ),
+        migrations.RenameField(
+            model_name="ticker",
+            old_name="last_price_num",
+            new_name="last_price",
+        ),
+        migrations.RemoveField(
+            model_name="ticker",
+            name="last_qty",
+        ),
+        migrations.RenameField(
+            model_name="ticker",
+            old_name="last_qty_num",
+            new_name="last_qty",
+        ),
+        migrations.RemoveField(
+            model_name="ticker",
+            name="bid_price",
+        ),
+        migrations.RenameField(
+            model_name="ticker",
+            old_name="bid_price_num",
+            new_name="bid_price",
+        ),
+        migrations.RemoveField(
+            model_name="ticker",
+            name="bid_qty",
+        ),
+        migrations.RenameField(
+            model_name="ticker",
+            old_name="bid_qty_num",
+            new_name="bid_qty",
+        ),
+        migrations.RemoveField(
+            model_name="ticker",
+            name="ask_price",
+        ),
+        migrations.RenameField(
+            model_name="ticker",
+            old_name="ask_price_num",
+            new_name="ask_price",
+        ),
+        migrations.RemoveField(
+            model_name="ticker",
+            name="ask_qty",
+        ),
+        migrations.RenameField(
+            model_name="ticker",
+            old_name="ask_qty_num",
+            new_name="ask_qty",
+        ),
+        migrations.RemoveField(
+            model_name="ticker",
+            name="open_price",
+        ),
+        migrations.RenameField(
+            model_name="ticker",
+            old_name="open_price_num",
+            new_name="open_price",
+        ),
+        migrations.RemoveField(
+            model_name="ticker",
+            name="high_price",
+        ),
+        migrations.RenameField(
+            model_name="ticker",
+            old_name="high_price_num",
+            new_name="high_price",
+        ),
+        migrations.RemoveField(
+            model_name="ticker",
+            name="low_price",
+        ),
+        migrations.RenameField(
+            model_name="ticker",
+            old_name="low_price_num",
+            new_name="low_price",
+        ),
+        migrations.RemoveField(
+            model_name="ticker",
+            name="volume",
+        ),
+        migrations.RenameField(
+            model_name="ticker",
+            old_name="volume_num",
+            new_name="volume",
+        ),
+        migrations.RemoveField(
+            model_name="ticker",
+            name="quote_volume",
+        ),
+        migrations.RenameField(
+            model_name="ticker",
+            old_name="quote_volume_num",
+            new_name="quote_volume",
+        ),
+    ]
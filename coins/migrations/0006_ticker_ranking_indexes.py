@@ -0,0 +1,27 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("coins", "0005_ticker_numeric_swap"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ticker",
+            index=models.Index(
+                fields=["fetched_at", "price_change_percent"],
+                name="coins_ticke_fetched_9acfff_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticker",
+            index=models.Index(
+                fields=["fetched_at", "quote_volume"],
+                name="coins_ticke_fetched_a616ea_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("coins", "0006_ticker_ranking_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ticker",
+            index=models.Index(
+                fields=["fetched_at", "symbol"], name="coins_ticke_fetched_26f07f_idx"
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="ticker",
+            name="coins_ticke_fetched_880b48_idx",
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("coins", "0007_ticker_fetched_at_symbol_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TickerSeriesChunk",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("symbol", models.CharField(max_length=20)),
+                ("year", models.PositiveSmallIntegerField()),
+                ("points", models.JSONField(default=list)),
+            ],
+            options={
+                "unique_together": {("symbol", "year")},
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+def backfill_series(apps, schema_editor):
+    """
+    Builds the series of the history stored before 0008, the chart reads only the chunks once a symbol has one
+    """
+    from coins.series import rebuild_series
+
+    rebuild_series(
+        ticker_model=apps.get_model("coins", "Ticker"),
+        chunk_model=apps.get_model("coins", "TickerSeriesChunk"),
+        using=schema_editor.connection.alias,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("coins", "0008_ticker_series_chunk"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_series, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.20 on 2026-10-18 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("coins", "0009_ticker_series_backfill"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TickerFetchLock",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fetched_at", models.DateField(unique=True)),
+                ("acquired_at", models.DateTimeField()),
+            ],
+        ),
+    ]
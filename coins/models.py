@@ -1,24 +1,29 @@
 from django.db import models
 
 
+def price_field(null=False):
+    return models.DecimalField(max_digits=40, decimal_places=8, null=null)
+
+
 class Ticker(models.Model):
     symbol = models.CharField(max_length=20)
 
-    price_change = models.CharField(max_length=20)
-    price_change_percent = models.CharField(max_length=20)
-    weighted_avg_price = models.CharField(max_length=20)
-    prev_close_price = models.CharField(max_length=20)
-    last_price = models.CharField(max_length=20)
-    last_qty = models.CharField(max_length=20)
-    bid_price = models.CharField(max_length=20)
-    bid_qty = models.CharField(max_length=20)
-    ask_price = models.CharField(max_length=20)
-    ask_qty = models.CharField(max_length=20)
-    open_price = models.CharField(max_length=20)
-    high_price = models.CharField(max_length=20)
-    low_price = models.CharField(max_length=20)
-    volume = models.CharField(max_length=30)
-    quote_volume = models.CharField(max_length=30)
+    # nullable, the text columns these replaced held values that do not parse (see migration 0004)
+    price_change = price_field(null=True)
+    price_change_percent = price_field(null=True)
+    weighted_avg_price = price_field(null=True)
+    prev_close_price = price_field(null=True)
+    last_price = price_field(null=True)
+    last_qty = price_field(null=True)
+    bid_price = price_field(null=True)
+    bid_qty = price_field(null=True)
+    ask_price = price_field(null=True)
+    ask_qty = price_field(null=True)
+    open_price = price_field(null=True)
+    high_price = price_field(null=True)
+    low_price = price_field(null=True)
+    volume = price_field(null=True)
+    quote_volume = price_field(null=True)
 
     open_time = models.BigIntegerField()
     close_time = models.BigIntegerField()
@@ -32,10 +37,91 @@ class Ticker(models.Model):
         unique_together = ('symbol', 'fetched_at')
         indexes = [
             models.Index(fields=['symbol']),
-            models.Index(fields=['fetched_at']),
+            # one day ordered by symbol, used by the listing and its keyset pagination
+            models.Index(fields=['fetched_at', 'symbol']),
+            # ORDER BY ... LIMIT for the ranking endpoints walks these instead of sorting the day
+            models.Index(fields=['fetched_at', 'price_change_percent']),
+            models.Index(fields=['fetched_at', 'quote_volume']),
         ]
         ordering = ['-fetched_at', 'symbol']
 
     def __str__(self):
         return f"{self.symbol} on {self.fetched_at}"
 
+
+
+
+class TickerSnapshot(models.Model):
+    """
+    Intraday price snapshot taken every `COINS_SNAPSHOT_INTERVAL` seconds. The table is append only,
+    old rows are folded into `TickerBar` by the rollup task.
+    """
+    symbol = models.CharField(max_length=20)
+    ts = models.DateTimeField()
+
+    last_price = price_field()
+    price_change_percent = price_field()
+    quote_volume = price_field()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['symbol', 'ts']),
+            models.Index(fields=['ts']),
+        ]
+
+    def __str__(self):
+        return f"{self.symbol} at {self.ts}"
+
+
+class TickerBar(models.Model):
+    """
+    Hourly OHLC bar downsampled from `TickerSnapshot` rows.
+    """
+    symbol = models.CharField(max_length=20)
+    ts = models.DateTimeField()
+
+    open_price = price_field()
+    high_price = price_field()
+    low_price = price_field()
+    close_price = price_field()
+    price_change_percent = price_field()
+    quote_volume = price_field()
+
+    class Meta:
+        unique_together = ('symbol', 'ts')
+        indexes = [
+            models.Index(fields=['ts']),
+        ]
+        ordering = ['symbol', 'ts']
+
+    def __str__(self):
+        return f"{self.symbol} hour {self.ts}"
+
+
+class TickerSeriesChunk(models.Model):
+    """
+    Precomputed daily chart series of a symbol, packed one row per calendar year. `points` holds
+    [date, last_price, price_change_percent] triples ordered by date, so a chart is a single
+    keyed read and an ingestion only rewrites the current year.
+    """
+    symbol = models.CharField(max_length=20)
+    year = models.PositiveSmallIntegerField()
+    points = models.JSONField(default=list)
+
+    class Meta:
+        unique_together = ('symbol', 'year')
+
+    def __str__(self):
+        return f"{self.symbol} series {self.year}"
+
+
+class TickerFetchLock(models.Model):
+    """
+    Single-flight lock of the ticker fetch of a day, a row exists while a fetch is in flight. It lives in the
+    DB so that every web process and the Celery worker see the same lock whatever the cache backend.
+    """
+    fetched_at = models.DateField(unique=True)
+    acquired_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"fetch lock {self.fetched_at}"
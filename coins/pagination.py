@@ -0,0 +1,120 @@
+import base64
+import hashlib
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .cache import RESPONSE_CACHE_TIMEOUT, get_generation
+
+# largest page a client can ask for with `page_size`
+MAX_PAGE_SIZE = 1000
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Django paginator that caches the COUNT(*) of its queryset until the next ticker ingestion, when the
+    cache is shared with the Celery worker that bumps the generation (CACHE_SHARED)
+    """
+
+    @cached_property
+    def count(self):
+        if not settings.CACHE_SHARED:
+            return super().count
+        query = str(self.object_list.query).encode()
+        key = f"coins:count:{get_generation('tickers')}:{hashlib.md5(query).hexdigest()}"
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, RESPONSE_CACHE_TIMEOUT)
+        return count
+
+
+class TickerPageNumberPagination(PageNumberPagination):
+    django_paginator_class = CachedCountPaginator
+    page_size_query_param = "page_size"
+    max_page_size = MAX_PAGE_SIZE
+
+
+class TickerKeysetPagination(BasePagination):
+    """
+    Keyset pagination on the Ticker ordering (-fetched_at, symbol).
+
+    The cursor holds the key of the last row served, so every page is an index range scan
+    without OFFSET and without a COUNT(*).
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            fetched_at, symbol = position
+            queryset = queryset.filter(Q(fetched_at__lt=fetched_at) | Q(fetched_at=fetched_at, symbol__gt=symbol))
+
+        rows = list(queryset.order_by("-fetched_at", "symbol")[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = (rows[-1].fetched_at, rows[-1].symbol) if self.has_next else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.REST_FRAMEWORK["PAGE_SIZE"]
+        if page_size <= 0:
+            return settings.REST_FRAMEWORK["PAGE_SIZE"]
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            fetched_at, symbol = base64.urlsafe_b64decode(encoded.encode()).decode().split("|", 1)
+            return date.fromisoformat(fetched_at), symbol
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound("Invalid cursor")
+
+    def encode_cursor(self, position):
+        fetched_at, symbol = position
+        return base64.urlsafe_b64encode(f"{fetched_at.isoformat()}|{symbol}".encode()).decode()
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "first": self.get_first_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "first": {"type": "string", "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -1,8 +1,85 @@
+from decimal import Decimal
+from functools import lru_cache
+
+from django.db import models
 from rest_framework import serializers
 from .models import Ticker
 
+# fields of the ticker listing, in TickerSerializer's order
+TICKER_OUTPUT_FIELDS = tuple(field.name for field in Ticker._meta.concrete_fields)
+
+
+def format_decimal(value):
+    """
+    Renders decimals the way DRF's DecimalField does, as fixed point strings
+    """
+    return format(value, "f") if isinstance(value, Decimal) else value
+
 
 class TickerSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticker
         fields = '__all__'
+
+
+def parse_ticker_fields(value):
+    """
+    Parses a comma separated `fields` query param, all the ticker fields when it is empty
+    :raise ValueError: on unknown field names
+    """
+    if not value:
+        return TICKER_OUTPUT_FIELDS
+    fields = tuple(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in fields if name not in TICKER_OUTPUT_FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(TICKER_OUTPUT_FIELDS)}")
+    return fields
+
+
+def _format_fixed(value):
+    # Django already quantized the value to the field's decimal places
+    return None if value is None else format(value, "f")
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+def _identity(value):
+    return value
+
+
+def _ticker_converters(fields):
+    """
+    Returns a tuple with, per field, the function rendering its raw value the way TickerSerializer does
+    """
+    converters = []
+    for name in fields:
+        field = Ticker._meta.get_field(name)
+        if isinstance(field, models.DecimalField):
+            converters.append(_format_fixed)
+        elif isinstance(field, models.DateField):
+            converters.append(_isoformat)
+        else:
+            converters.append(_identity)
+    return tuple(converters)
+
+
+@lru_cache(maxsize=256)
+def ticker_row_mapper(fields):
+    """
+    Builds a function turning a `values_list(*fields)` row into the dict TickerSerializer outputs for
+    those fields without going through DRF fields per value.
+    :param fields: names checked by `parse_ticker_fields`
+    """
+    pairs = tuple(zip(fields, _ticker_converters(fields)))
+    return lambda row: {name: convert(value) for (name, convert), value in zip(pairs, row)}
+
+
+@lru_cache(maxsize=256)
+def ticker_row_formatter(fields):
+    """
+    Like `ticker_row_mapper` but returns a tuple of the rendered values, for the row based export formats
+    """
+    converters = _ticker_converters(fields)
+    return lambda row: tuple(convert(value) for convert, value in zip(converters, row))
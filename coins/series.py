@@ -0,0 +1,98 @@
+from bisect import bisect_left
+from decimal import Decimal
+from itertools import groupby
+
+from django.db import transaction
+
+from .models import Ticker, TickerSeriesChunk
+
+QUANTUM = Decimal("1e-8")
+
+
+def _decimal_str(value):
+    # same fixed point rendering the API uses for the stored DecimalField, NULL stays None
+    if value is None:
+        return None
+    return format(Decimal(value).quantize(QUANTUM), "f")
+
+
+def _insert_point(points, point):
+    """
+    Inserts `point` keeping `points` ordered by date, replacing a point of the same date
+    """
+    index = bisect_left(points, point[0], key=lambda p: p[0])
+    if index < len(points) and points[index][0] == point[0]:
+        points[index] = point
+    else:
+        points.insert(index, point)
+
+
+def append_series_points(tickers, fetched_at):
+    """
+    Adds the daily points of freshly stored `tickers` to their precomputed series, only the chunk
+    of `fetched_at`'s year is read and rewritten
+    :param tickers: Ticker instances stored for `fetched_at`, or anything with their symbol, last_price and
+                    price_change_percent
+    """
+    year = fetched_at.year
+    day = fetched_at.isoformat()
+    points = {
+        ticker.symbol: [day, _decimal_str(ticker.last_price), _decimal_str(ticker.price_change_percent)]
+        for ticker in tickers
+    }
+    chunks = {chunk.symbol: chunk for chunk in TickerSeriesChunk.objects.filter(year=year, symbol__in=points)}
+
+    to_create = []
+    for symbol, point in points.items():
+        chunk = chunks.get(symbol)
+        if chunk is None:
+            to_create.append(TickerSeriesChunk(symbol=symbol, year=year, points=[point]))
+        else:
+            _insert_point(chunk.points, point)
+
+    TickerSeriesChunk.objects.bulk_create(to_create)
+    TickerSeriesChunk.objects.bulk_update(chunks.values(), ["points"])
+
+
+def read_series(symbol):
+    """
+    Returns the [date, last_price, price_change_percent] points of `symbol` ordered by date
+    """
+    chunks = TickerSeriesChunk.objects.filter(symbol=symbol).order_by("year").values_list("points", flat=True)
+    return [point for points in chunks for point in points]
+
+
+def rebuild_series(batch_size=500, ticker_model=Ticker, chunk_model=TickerSeriesChunk, using="default"):
+    """
+    Rebuilds every series from the Ticker history
+    :param ticker_model: the Ticker model to read, migrations pass their historical one
+    :param chunk_model: the TickerSeriesChunk model to write
+    :return: number of chunks written
+    """
+    rows = (
+        ticker_model.objects.using(using).order_by("symbol", "fetched_at")
+        .values_list("symbol", "fetched_at", "last_price", "price_change_percent")
+        .iterator(chunk_size=2000)
+    )
+
+    count = 0
+    batch = []
+    with transaction.atomic(using=using):
+        chunk_model.objects.using(using).all().delete()
+        for (symbol, year), group in groupby(rows, key=lambda row: (row[0], row[1].year)):
+            batch.append(chunk_model(
+                symbol=symbol,
+                year=year,
+                points=[
+                    [fetched_at.isoformat(), _decimal_str(price), _decimal_str(change)]
+                    for _, fetched_at, price, change in group
+                ],
+            ))
+            if len(batch) >= batch_size:
+                chunk_model.objects.using(using).bulk_create(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            chunk_model.objects.using(using).bulk_create(batch)
+            count += len(batch)
+    return count
@@ -1,3 +1,372 @@
-from django.test import TestCase
+import base64
+import json
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.db import OperationalError, connection
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+
+from .analytics import quote_asset_summary
+from .cache import bump_generation, cached_response_data
+from .fetch_tickers import (
+    FETCH_LOCK_TIMEOUT,
+    acquire_fetch_lock,
+    build_ticker,
+    fetch_and_store_ticker_data,
+    iter_json_array,
+    spool_json_array,
+    store_tickers,
+)
+from .models import Ticker, TickerFetchLock
+from .pagination import CachedCountPaginator, TickerKeysetPagination
+from .series import read_series
+
+
+def split_bytes(payload, size):
+    return [payload[i:i + size] for i in range(0, len(payload), size)]
+
+
+class IterJsonArrayTests(SimpleTestCase):
+    # chunk sizes from a single byte up to more than the whole test payloads
+    CHUNK_SIZES = (1, 2, 3, 5, 7, 16, 64, 1024, 64 * 1024)
+
+    def parse(self, payload, size):
+        return list(iter_json_array(split_bytes(payload, size)))
+
+    def test_valid_arrays_at_every_chunk_size(self):
+        cases = [
+            "[]",
+            " [ ] \n",
+            "[1]",
+            "[1,2,3]",
+            '[ {"symbol": "BTCUSDT", "lastPrice": "1.50"} ,\n {"symbol": "ÉTHUSDT"} ]',
+            '[12345, "a,b]", [1, [2]], {"k": "]"}, null, true, -0.5e3]',
+        ]
+        for text in cases:
+            expected = json.loads(text)
+            for size in self.CHUNK_SIZES:
+                with self.subTest(text=text, size=size):
+                    self.assertEqual(self.parse(text.encode(), size), expected)
+
+    def test_malformed_arrays_are_rejected(self):
+        cases = [
+            "",
+            "   ",
+            "{}",
+            "[",
+            "[1",
+            "[1,",
+            "[1 2]",
+            "[1,,2]",
+            "[,1]",
+            "[1,]",
+            "[,]",
+            "[1]]",
+            "[1] x",
+            "[1][2]",
+            '[{"a": 1}',
+            "[tru]",
+        ]
+        for text in cases:
+            for size in self.CHUNK_SIZES:
+                with self.subTest(text=text, size=size):
+                    with self.assertRaises(ValueError):
+                        self.parse(text.encode(), size)
+
+    def test_large_payload(self):
+        items = [
+            {"symbol": f"SYM{index}USDT", "lastPrice": f"{index}.{index % 97:08d}", "count": index}
+            for index in range(12000)
+        ]
+        payload = json.dumps(items).encode()
+        for size in (1, 7, 1024, 64 * 1024):
+            with self.subTest(size=size):
+                self.assertEqual(self.parse(payload, size), items)
+
+
+
+class SpoolJsonArrayTests(SimpleTestCase):
+    def test_round_trip_in_memory_and_on_disk(self):
+        items = [{"symbol": f"SYM{index}USDT", "lastPrice": "0.00000001", "count": index} for index in range(500)]
+        payload = json.dumps(items).encode()
+        for max_size in (0, 1024 * 1024):
+            with self.subTest(max_size=max_size):
+                self.assertEqual(list(spool_json_array(split_bytes(payload, 1000), max_size=max_size)), items)
+
+    def test_malformed_payload_fails_before_anything_is_read_back(self):
+        with self.assertRaises(ValueError):
+            spool_json_array([b'[{"symbol": "BTCUSDT"}', b' {"symbol": "ETHUSDT"}]'])
+
+
+def ticker_item(symbol, last_price="1.50000000"):
+    return {
+        "symbol": symbol, "priceChange": "0.10000000", "priceChangePercent": "7.143",
+        "weightedAvgPrice": "1.45000000", "prevClosePrice": "1.40000000", "lastPrice": last_price,
+        "lastQty": "2.00000000", "bidPrice": "1.49000000", "bidQty": "3.00000000", "askPrice": "1.51000000",
+        "askQty": "4.00000000", "openPrice": "1.40000000", "highPrice": "1.60000000", "lowPrice": "1.30000000",
+        "volume": "1000.00000000", "quoteVolume": "1500.00000000", "openTime": 1, "closeTime": 2,
+        "firstId": 10, "lastId": 20, "count": 11,
+    }
+
+
+class FetchLockTests(TestCase):
+    def test_first_caller_takes_the_lock(self):
+        self.assertTrue(acquire_fetch_lock(date.today()))
+        self.assertFalse(acquire_fetch_lock(date.today()))
+
+    def test_in_flight_lock_is_read_without_writing(self):
+        TickerFetchLock.objects.create(fetched_at=date.today(), acquired_at=timezone.now())
+        with mock.patch.object(TickerFetchLock.objects, "create") as create:
+            self.assertFalse(acquire_fetch_lock(date.today()))
+        create.assert_not_called()
+
+    def test_expired_lock_is_taken_over(self):
+        acquired_at = timezone.now() - timedelta(seconds=FETCH_LOCK_TIMEOUT + 1)
+        TickerFetchLock.objects.create(fetched_at=date.today(), acquired_at=acquired_at)
+        self.assertTrue(acquire_fetch_lock(date.today()))
+        self.assertGreater(TickerFetchLock.objects.get().acquired_at, acquired_at)
+
+    def test_locked_database_counts_as_in_flight(self):
+        locked = OperationalError("database is locked")
+        with mock.patch.object(TickerFetchLock.objects, "create", side_effect=locked), \
+                self.assertLogs("coins.fetch_tickers", "WARNING"):
+            self.assertFalse(acquire_fetch_lock(date.today()))
+
+
+class TodayTickerLockedDatabaseTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user("a@b.c", "A", password="pw")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+        locked = mock.patch.object(
+            TickerFetchLock.objects, "create", side_effect=OperationalError("database is locked")
+        )
+        delay = mock.patch("coins.fetch_tickers.fetch_and_store_ticker_data.delay")
+        locked.start()
+        self.delay = delay.start()
+        self.addCleanup(locked.stop)
+        self.addCleanup(delay.stop)
+
+    def test_serves_the_latest_day_as_stale(self):
+        yesterday = date.today() - timedelta(days=1)
+        build_ticker(ticker_item("BTCUSDT"), yesterday).save()
+
+        with self.assertLogs("coins.fetch_tickers", "WARNING"):
+            response = self.client.get("/api/tickers/today/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["stale"])
+        self.assertEqual(response.json()["fetched_at"], yesterday.isoformat())
+        self.delay.assert_not_called()
+
+    def test_accepted_without_stored_data(self):
+        with self.assertLogs("coins.fetch_tickers", "WARNING"):
+            response = self.client.get("/api/tickers/today/")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertIn("Retry-After", response)
+        self.delay.assert_not_called()
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def iter_content(self, chunk_size=None):
+        return iter(self.chunks)
+
+
+class FetchAndStoreTickerDataTests(TestCase):
+    def test_payload_is_downloaded_before_the_write_transaction(self):
+        depth = len(connection.savepoint_ids)
+        depths = []
+
+        def chunks():
+            for chunk in split_bytes(json.dumps([ticker_item("BTCUSDT"), ticker_item("ETHUSDT")]).encode(), 64):
+                depths.append(len(connection.savepoint_ids))
+                yield chunk
+
+        with mock.patch("coins.fetch_tickers.http_client.get", return_value=FakeResponse(chunks())):
+            result = fetch_and_store_ticker_data()
+
+        self.assertEqual(set(depths), {depth})
+        self.assertEqual(Ticker.objects.filter(fetched_at=date.today()).count(), 2)
+        self.assertIn("2 tickers saved", result)
+        self.assertFalse(TickerFetchLock.objects.exists())
+
+
+@mock.patch("coins.fetch_tickers.SERIES_BATCH_PAUSE", 0)
+class StoreTickersTests(TestCase):
+    day = date(2024, 3, 1)
+
+    def test_counts_new_duplicate_and_symbolless_items(self):
+        items = [ticker_item("BTCUSDT"), ticker_item("ETHUSDT"), ticker_item("BTCUSDT", "9.00000000"), {}]
+        items.append({**ticker_item(""), "symbol": ""})
+
+        stats = store_tickers(items, self.day, batch_size=1)
+
+        self.assertEqual((stats["inserted"], stats["updated"], stats["skipped"]), (2, 0, 3))
+        # the first occurrence of a symbol wins
+        self.assertEqual(str(Ticker.objects.get(symbol="BTCUSDT").last_price), "1.50000000")
+        self.assertEqual(read_series("ETHUSDT"), [["2024-03-01", "1.50000000", "7.14300000"]])
+
+    def test_existing_rows_are_skipped_without_upsert(self):
+        store_tickers([ticker_item("BTCUSDT")], self.day)
+
+        stats = store_tickers([ticker_item("BTCUSDT", "2.00000000"), ticker_item("ETHUSDT")], self.day)
+
+        self.assertEqual((stats["inserted"], stats["updated"], stats["skipped"]), (1, 0, 1))
+        self.assertEqual(str(Ticker.objects.get(symbol="BTCUSDT").last_price), "1.50000000")
+        self.assertEqual(read_series("BTCUSDT"), [["2024-03-01", "1.50000000", "7.14300000"]])
+
+    def test_existing_rows_are_updated_with_upsert(self):
+        store_tickers([ticker_item("BTCUSDT")], self.day)
+
+        stats = store_tickers([ticker_item("BTCUSDT", "2.00000000"), ticker_item("ETHUSDT")], self.day, upsert=True)
+
+        self.assertEqual((stats["inserted"], stats["updated"], stats["skipped"]), (1, 1, 0))
+        self.assertEqual(Ticker.objects.filter(fetched_at=self.day).count(), 2)
+        self.assertEqual(str(Ticker.objects.get(symbol="BTCUSDT").last_price), "2.00000000")
+        # the series point of the day is replaced, not appended
+        self.assertEqual(read_series("BTCUSDT"), [["2024-03-01", "2.00000000", "7.14300000"]])
+
+    def test_nothing_written_does_not_bump_the_generation(self):
+        store_tickers([ticker_item("BTCUSDT")], self.day)
+
+        with mock.patch("coins.fetch_tickers.bump_generation") as bump, self.captureOnCommitCallbacks(execute=True):
+            stats = store_tickers([ticker_item("BTCUSDT")], self.day)
+
+        self.assertEqual(stats["skipped"], 1)
+        bump.assert_not_called()
+
+        with mock.patch("coins.fetch_tickers.bump_generation") as bump, self.captureOnCommitCallbacks(execute=True):
+            store_tickers([ticker_item("ETHUSDT")], self.day)
+
+        bump.assert_called_once_with("tickers")
+
+
+class QuoteAssetSummaryTests(TestCase):
+    def test_aggregates_render_like_the_stored_fields(self):
+        day = date(2025, 3, 28)
+        build_ticker({**ticker_item("BTCUSDT"), "priceChangePercent": "200.317", "quoteVolume": "0.1"}, day).save()
+        build_ticker({**ticker_item("ETHUSDT"), "priceChangePercent": "-1.5", "quoteVolume": "0.2"}, day).save()
+        build_ticker({**ticker_item("XRPUSDT"), "priceChangePercent": "-0.00000001", "quoteVolume": "0.3"}, day).save()
+
+        summary = quote_asset_summary(day)["USDT"]
+
+        self.assertEqual(summary, {
+            "pairs": 3,
+            "quote_volume": "0.60000000",
+            "avg_price_change_percent": "66.27233333",
+            "max_price_change_percent": "200.31700000",
+            "min_price_change_percent": "-1.50000000",
+        })
+        self.assertEqual(quote_asset_summary(day)["BTC"]["quote_volume"], None)
+
+
+class CachedCountPaginatorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.day = date(2025, 3, 28)
+        build_ticker(ticker_item("BTCUSDT"), self.day).save()
+
+    def count(self):
+        return CachedCountPaginator(Ticker.objects.filter(fetched_at=self.day).order_by("symbol"), 10).count
+
+    def test_counts_every_time_without_a_shared_cache(self):
+        self.assertEqual(self.count(), 1)
+        build_ticker(ticker_item("ETHUSDT"), self.day).save()
+        self.assertEqual(self.count(), 2)
+
+    @override_settings(CACHE_SHARED=True)
+    def test_shared_cache_keeps_the_count_until_the_next_ingestion(self):
+        self.assertEqual(self.count(), 1)
+        build_ticker(ticker_item("ETHUSDT"), self.day).save()
+        self.assertEqual(self.count(), 1)
+        bump_generation("tickers")
+        self.assertEqual(self.count(), 2)
+
+
+class CachedResponseDataTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return {"calls": self.calls}
+
+    def test_computes_every_time_without_a_shared_cache(self):
+        cached_response_data("test", self.compute, symbol="BTCUSDT")
+        self.assertEqual(cached_response_data("test", self.compute, symbol="BTCUSDT"), {"calls": 2})
+
+    @override_settings(CACHE_SHARED=True)
+    def test_shared_cache_serves_the_same_data_until_the_generation_is_bumped(self):
+        cached_response_data("test", self.compute, symbol="BTCUSDT")
+        self.assertEqual(cached_response_data("test", self.compute, symbol="BTCUSDT"), {"calls": 1})
+        self.assertEqual(cached_response_data("test", self.compute, symbol="ETHUSDT"), {"calls": 2})
+        bump_generation("tickers")
+        self.assertEqual(cached_response_data("test", self.compute, symbol="BTCUSDT"), {"calls": 3})
+
+
+class TickerKeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for day in (date(2025, 3, 27), date(2025, 3, 28)):
+            for symbol in ("ADAUSDT", "BNBUSDT", "BTCUSDT", "ETHUSDT", "XRPUSDT"):
+                build_ticker(ticker_item(symbol), day).save()
+        cls.expected = list(Ticker.objects.order_by("-fetched_at", "symbol").values_list("fetched_at", "symbol"))
+
+    def page(self, params):
+        paginator = TickerKeysetPagination()
+        request = Request(APIRequestFactory().get("/api/tickers/today/", params))
+        rows = paginator.paginate_queryset(Ticker.objects.all(), request)
+        return paginator, [(row.fetched_at, row.symbol) for row in rows]
+
+    def walk(self, page_size):
+        params, seen = {"page_size": page_size}, []
+        while True:
+            paginator, rows = self.page(params)
+            seen += rows
+            if paginator.next_position is None:
+                return seen
+            params["cursor"] = paginator.encode_cursor(paginator.next_position)
+
+    def test_pages_cover_every_row_once_across_days(self):
+        for page_size in (1, 3, 5, 10, 11):
+            with self.subTest(page_size=page_size):
+                self.assertEqual(self.walk(page_size), self.expected)
+
+    def test_full_last_page_has_no_next_link(self):
+        paginator, rows = self.page({"page_size": len(self.expected)})
+        self.assertEqual(rows, self.expected)
+        self.assertIsNone(paginator.get_next_link())
+
+    def test_cursor_round_trip(self):
+        paginator = TickerKeysetPagination()
+        position = (date(2025, 3, 28), "ODD|SYMBOL")
+        request = Request(APIRequestFactory().get("/", {"cursor": paginator.encode_cursor(position)}))
+        self.assertEqual(paginator.decode_cursor(request), position)
+
+    def test_invalid_cursor_is_not_found(self):
+        paginator = TickerKeysetPagination()
+        invalid = (b"2025-13-01|BTCUSDT", b"no separator", b"\xff\xfe|BTCUSDT")
+        for cursor in ("%%%", *(base64.urlsafe_b64encode(value).decode() for value in invalid)):
+            with self.subTest(cursor=cursor), self.assertRaises(NotFound):
+                paginator.decode_cursor(Request(APIRequestFactory().get("/", {"cursor": cursor})))
@@ -1,8 +1,22 @@
 from django.urls import path
-from .views import TodayTickerAPIView, CoinStatusAPIView, CoinChartDataAPIView
+from .views import (
+    TodayTickerAPIView,
+    CoinStatusAPIView,
+    CoinChartDataAPIView,
+    TopMoversAPIView,
+    VolumeLeadersAPIView,
+    QuoteAssetSummaryAPIView,
+    CacheStatsAPIView,
+    TickerExportAPIView,
+)
 
 urlpatterns = [
     path('tickers/today/', TodayTickerAPIView.as_view(), name='today-tickers'),
     path('tickers/status/', CoinStatusAPIView.as_view(), name='coin-status'),
     path('tickers/chart-data/', CoinChartDataAPIView.as_view(), name='chart-data'),
+    path('tickers/top-movers/', TopMoversAPIView.as_view(), name='top-movers'),
+    path('tickers/volume-leaders/', VolumeLeadersAPIView.as_view(), name='volume-leaders'),
+    path('tickers/quote-summary/', QuoteAssetSummaryAPIView.as_view(), name='quote-summary'),
+    path('tickers/export/', TickerExportAPIView.as_view(), name='ticker-export'),
+    path('tickers/cache-stats/', CacheStatsAPIView.as_view(), name='cache-stats'),
 ]
@@ -1,56 +1,244 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
+from django.utils.cache import patch_vary_headers
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.settings import api_settings
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from datetime import date
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import chain, groupby
 
-from .fetch_tickers import fetch_and_store_ticker_data
-from .models import Ticker
-from .serializers import TickerSerializer
+from accounts.authentication import RevocableStatelessJWTAuthentication
+
+from . import analytics
+from .cache import cache_stats, cached_response_data
+from .fetch_tickers import request_ticker_fetch, truncate_hour
+from .models import Ticker, TickerBar, TickerSnapshot
+from .pagination import MAX_PAGE_SIZE, TickerKeysetPagination, TickerPageNumberPagination
+from .renderers import (
+    EXPORT_RENDERERS,
+    CSVRowsRenderer,
+    NDJSONRowsRenderer,
+    StreamingRowsRenderer,
+    async_chunks,
+    gzip_chunks,
+)
+from .serializers import (
+    TICKER_OUTPUT_FIELDS,
+    TickerSerializer,
+    format_decimal,
+    parse_ticker_fields,
+    ticker_row_formatter,
+    ticker_row_mapper,
+)
+from .series import read_series
+
+# price change % beyond which a coin is reported as trending
+TREND_THRESHOLD = Decimal("0.2")
+
+# seconds clients are told to wait while today's tickers are being fetched
+FETCH_RETRY_AFTER = 30
+
+# query params the ticker listing depends on
+PAGINATION_PARAMS = ('symbol', 'page', 'page_size', 'pagination', 'cursor', 'fields')
+
+# maximum number of rows the ranking endpoints return
+MAX_ANALYTICS_LIMIT = 100
+
+# chart resolutions: raw intraday snapshots, hourly bars and the daily Ticker rows
+RESOLUTIONS = ("1m", "1h", "1d")
+
+# rows fetched per round trip by the server side cursor of the streamed formats
+STREAM_CHUNK_SIZE = 2000
+
+# field names of the chart points
+CHART_FIELDS = ("date", "last_price", "price_change_percent")
+
+FORMAT_DESCRIPTION = (
+    " Besides JSON the data can be requested as `csv`, `ndjson` (one object per line) or `columnar` "
+    "(one array per field) through the Accept header or `?format=`, these are streamed unpaginated."
+)
+
+
+def get_chart_points(symbol, resolution="1d"):
+    """
+    Returns (ISO timestamp, last_price, price_change_percent) triples for `symbol` ordered by time
+    """
+    return list(iter_chart_points(symbol, resolution))
+
+
+def iter_chart_points(symbol, resolution="1d"):
+    """
+    Lazy `get_chart_points`, the rows are read through a server side cursor
+    """
+    if resolution == "1m":
+        queryset = TickerSnapshot.objects.filter(symbol=symbol).order_by("ts")
+        points = queryset.values_list("ts", "last_price", "price_change_percent")
+    elif resolution == "1h":
+        yield from iter_hourly_points(symbol)
+        return
+    else:
+        series = read_series(symbol)
+        if series:
+            yield from series
+            return
+        # nothing precomputed yet, e.g. before `rebuild_ticker_series` ran
+        queryset = Ticker.objects.filter(symbol=symbol).order_by("fetched_at")
+        points = queryset.values_list("fetched_at", "last_price", "price_change_percent")
+    for ts, price, change in points.iterator(chunk_size=STREAM_CHUNK_SIZE):
+        yield ts.isoformat(), format_decimal(price), format_decimal(change)
+
+
+def iter_hourly_points(symbol):
+    """
+    Hourly points of `symbol`: the TickerBar rows, then the hours the rollup has not reached yet (the last
+    `COINS_SNAPSHOT_RETENTION`) bucketed on the fly from the snapshots the same way the rollup does
+    """
+    bars = TickerBar.objects.filter(symbol=symbol).order_by("ts")
+    bars = bars.values_list("ts", "close_price", "price_change_percent")
+    last_bar = None
+    for ts, price, change in bars.iterator(chunk_size=STREAM_CHUNK_SIZE):
+        last_bar = ts
+        yield ts.isoformat(), format_decimal(price), format_decimal(change)
+
+    snapshots = TickerSnapshot.objects.filter(symbol=symbol).order_by("ts")
+    if last_bar is not None:
+        snapshots = snapshots.filter(ts__gte=last_bar + timedelta(hours=1))
+    rows = snapshots.values_list("ts", "last_price", "price_change_percent").iterator(chunk_size=STREAM_CHUNK_SIZE)
+    for hour, group in groupby(rows, key=lambda row: truncate_hour(row[0])):
+        # the close of the hour, like the rollup's bars
+        *_, (_, price, change) = group
+        yield hour.isoformat(), format_decimal(price), format_decimal(change)
+
+
+def stream_rows(request, fields, rows, filename, attachment=False, compress=False):
+    """
+    Streams `rows` in the format of the negotiated export renderer
+    :param rows: iterable of value tuples in `fields` order
+    :param filename: base name of the download
+    :param attachment: also send NDJSON as a download, CSV always is one
+    :param compress: gzip the body when the client accepts it
+    """
+    renderer = request.accepted_renderer
+    content_type = renderer.media_type
+    if renderer.charset:
+        content_type += f"; charset={renderer.charset}"
+
+    chunks = renderer.stream(fields, rows)
+    gzipped = compress and 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+    if gzipped:
+        chunks = gzip_chunks(chunks)
+    if isinstance(request._request, ASGIRequest):
+        chunks = async_chunks(chunks)
+
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    if renderer.format == 'csv' or attachment:
+        response["Content-Disposition"] = f'attachment; filename="{filename}.{renderer.format}"'
+    if compress:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    if gzipped:
+        response["Content-Encoding"] = "gzip"
+    return response
 
 
 class TodayTickerAPIView(APIView):
+    # public market data, no user row is loaded but tokens revoked on logout are rejected
+    authentication_classes = [RevocableStatelessJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, *EXPORT_RENDERERS]
 
     @extend_schema(
         summary="Get Today's Binance Tickers (Paginated)",
-        description="Returns paginated Binance ticker data for the current day. Supports optional `symbol` filter.",
+        description="Returns paginated Binance ticker data for the current day. Supports optional `symbol` filter. "
+                    "While today's data is being fetched the latest stored day is returned with `stale: true`, "
+                    "or a 202 with a `Retry-After` header if nothing is stored yet." + FORMAT_DESCRIPTION,
         parameters=[
             OpenApiParameter(name='symbol', description='Filter by symbol (e.g. BTCUSDT)', required=False, type=str),
             OpenApiParameter(name='page', description='Page number (for pagination)', required=False, type=int),
+            OpenApiParameter(name='page_size', description=f'Rows per page (max {MAX_PAGE_SIZE})', required=False,
+                             type=int),
+            OpenApiParameter(name='pagination', description='`cursor` switches to keyset pagination, which has no '
+                                                            'page count but stays fast at any depth',
+                             required=False, type=str, enum=('page', 'cursor')),
+            OpenApiParameter(name='cursor', description='Cursor from the `next` link (keyset pagination)',
+                             required=False, type=str),
+            OpenApiParameter(name='fields', description='Comma separated subset of the ticker fields to return, '
+                                                        'e.g. symbol,last_price. One of: '
+                                                        + ', '.join(TICKER_OUTPUT_FIELDS),
+                             required=False, type=str),
         ],
-        responses={200: TickerSerializer(many=True)},
+        responses={200: TickerSerializer(many=True), 202: dict},
     )
     def get(self, request):
         """
-        It will fetch the Today's Ticker Data and Store it To DB if no data present in DB initially
+        Returns today's Ticker data. If it is not in the DB yet a single background fetch is dispatched
+        and the latest stored day is served in the meantime
         :param request:
         :return: returns the todays all coins data
         """
         today = date.today()
         symbol = request.GET.get('symbol')
+        try:
+            fields = parse_ticker_fields(request.GET.get('fields'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        fetched_at = today
+        if not Ticker.objects.filter(fetched_at=today).exists():
+            request_ticker_fetch()
+            fetched_at = analytics.latest_fetch_date()
+            if fetched_at is None:
+                return Response(
+                    {"detail": "Ticker data is being fetched, retry shortly."},
+                    status=status.HTTP_202_ACCEPTED,
+                    headers={"Retry-After": str(FETCH_RETRY_AFTER)},
+                )
 
-        queryset = Ticker.objects.filter(fetched_at=today)
+        if isinstance(request.accepted_renderer, StreamingRowsRenderer):
+            queryset = Ticker.objects.filter(fetched_at=fetched_at)
+            if symbol:
+                queryset = queryset.filter(symbol=symbol)
+            to_tuple = ticker_row_formatter(fields)
+            rows = queryset.order_by('symbol').values_list(*fields).iterator(chunk_size=STREAM_CHUNK_SIZE)
+            return stream_rows(request, fields, map(to_tuple, rows), f"tickers-{fetched_at.isoformat()}")
 
-        if len(queryset) == 0:
-            _ = fetch_and_store_ticker_data()
-            queryset = Ticker.objects.filter(fetched_at=today)
+        def build():
+            queryset = Ticker.objects.filter(fetched_at=fetched_at)
+            if symbol:
+                queryset = queryset.filter(symbol=symbol)
+            # plain rows instead of model instances, the keyset cursor also needs fetched_at and symbol
+            query_fields = fields + tuple(name for name in ('fetched_at', 'symbol') if name not in fields)
+            queryset = queryset.values_list(*query_fields, named=True)
 
-        if symbol:
-            queryset = queryset.filter(symbol=symbol)
+            if request.GET.get('pagination') == 'cursor':
+                paginator = TickerKeysetPagination()
+            else:
+                paginator = TickerPageNumberPagination()
+            rows = paginator.paginate_queryset(queryset, request)
+            to_dict = ticker_row_mapper(fields)
+            return paginator.get_paginated_response([to_dict(row) for row in rows]).data
 
-        paginator = PageNumberPagination()
-        paginated_qs = paginator.paginate_queryset(queryset, request)
-        serializer = TickerSerializer(paginated_qs, many=True)
+        data = cached_response_data(
+            'today-tickers', build,
+            date=fetched_at.isoformat(),
+            base=request.build_absolute_uri('/'),
+            **{param: request.GET.get(param, '') for param in PAGINATION_PARAMS},
+        )
 
-        return paginator.get_paginated_response(serializer.data)
+        response = Response({**data, "fetched_at": fetched_at.isoformat(), "stale": fetched_at != today})
+        if fetched_at != today:
+            response["Retry-After"] = str(FETCH_RETRY_AFTER)
+        return response
 
 
 class CoinStatusAPIView(APIView):
+    authentication_classes = [RevocableStatelessJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     @extend_schema(
@@ -69,43 +257,170 @@ class CoinStatusAPIView(APIView):
         if not symbol:
             return Response({"error": "Missing symbol param"}, status=status.HTTP_400_BAD_REQUEST)
 
+        symbol = symbol.upper()
         today = date.today()
-        try:
-            ticker = Ticker.objects.filter(symbol=symbol.upper(), fetched_at=today).latest('fetched_at')
-        except Ticker.DoesNotExist:
+        scopes = ("tickers", "snapshots") if settings.COINS_SNAPSHOT_INTERVAL else ("tickers",)
+        data = cached_response_data(
+            'coin-status', lambda: get_coin_status(symbol, today), scopes=scopes, symbol=symbol, date=today.isoformat()
+        )
+        if data is None:
             return Response({"error": "Data not found for symbol today."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(data)
+
+
+def get_coin_status(symbol, today):
+    """
+    Builds the status payload of `symbol` from its freshest row for `today`, None if there is none
+    """
+    ticker = None
+    if settings.COINS_SNAPSHOT_INTERVAL:
+        # the latest intraday snapshot is fresher than the daily row
+        ticker = TickerSnapshot.objects.filter(symbol=symbol, ts__date=today).order_by('-ts').first()
+    if ticker is None:
+        ticker = Ticker.objects.filter(symbol=symbol, fetched_at=today).first()
+    if ticker is None:
+        return None
+
+    change_percent = ticker.price_change_percent
+
+    # TODO: we can have config based Define trend logic
+
+    if change_percent > TREND_THRESHOLD:
+        trend = "uptrend"
+    elif change_percent < -TREND_THRESHOLD:
+        trend = "downtrend"
+    else:
+        trend = "flat"
+
+    return {
+        "symbol": ticker.symbol,
+        "last_price": format_decimal(ticker.last_price),
+        "price_change_percent": format_decimal(ticker.price_change_percent),
+        "trend": trend
+    }
+
+
+def get_analytics_params(request):
+    """
+    Parses the `date` and `limit` query params shared by the analytics endpoints
+    :return: (fetched_at, limit, error response or None)
+    """
+    try:
+        limit = min(int(request.GET.get('limit', 10)), MAX_ANALYTICS_LIMIT)
+        fetched_at = request.GET.get('date')
+        fetched_at = date.fromisoformat(fetched_at) if fetched_at else analytics.latest_fetch_date()
+    except ValueError:
+        return None, None, Response({"error": "Invalid date or limit param"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if limit < 1:
+        return None, None, Response({"error": "limit must be positive"}, status=status.HTTP_400_BAD_REQUEST)
+    if fetched_at is None:
+        return None, None, Response({"error": "No ticker data available."}, status=status.HTTP_404_NOT_FOUND)
+    return fetched_at, limit, None
+
+
+ANALYTICS_PARAMETERS = [
+    OpenApiParameter(name='date', description='Fetch date (YYYY-MM-DD), defaults to the latest one', required=False,
+                     type=str),
+    OpenApiParameter(name='limit', description=f'Number of rows (max {MAX_ANALYTICS_LIMIT})', required=False,
+                     type=int),
+]
 
-        try:
-            change_percent = float(ticker.price_change_percent)
-        except (TypeError, ValueError):
-            change_percent = 0.0
 
-        # TODO: we can have config based Define trend logic
+class TopMoversAPIView(APIView):
+    authentication_classes = [RevocableStatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
 
-        if change_percent > 0.2:
-            trend = "uptrend"
-        elif change_percent < -0.2:
-            trend = "downtrend"
-        else:
-            trend = "flat"
+    @extend_schema(
+        summary="Get Top Gainers or Losers",
+        description="Returns the top N symbols by 24h price change % for a fetch date.",
+        parameters=ANALYTICS_PARAMETERS + [
+            OpenApiParameter(name='direction', description='gainers or losers', required=False, type=str,
+                             enum=('gainers', 'losers'), default='gainers'),
+        ],
+        responses={200: dict, 400: dict, 404: dict},
+    )
+    def get(self, request):
+        fetched_at, limit, error = get_analytics_params(request)
+        if error:
+            return error
+
+        direction = request.GET.get('direction', 'gainers')
+        if direction not in ('gainers', 'losers'):
+            return Response({"error": "direction must be gainers or losers"}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({
-            "symbol": ticker.symbol,
-            "last_price": ticker.last_price,
-            "price_change_percent": ticker.price_change_percent,
-            "trend": trend
-        })
+        data = cached_response_data(
+            'top-movers',
+            lambda: {
+                "date": fetched_at.isoformat(),
+                "direction": direction,
+                "results": analytics.top_movers(fetched_at, direction, limit),
+            },
+            date=fetched_at.isoformat(), direction=direction, limit=limit,
+        )
+        return Response(data)
+
+
+class VolumeLeadersAPIView(APIView):
+    authentication_classes = [RevocableStatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Get Volume Leaders",
+        description="Returns the top N symbols by 24h quote volume for a fetch date.",
+        parameters=ANALYTICS_PARAMETERS,
+        responses={200: dict, 400: dict, 404: dict},
+    )
+    def get(self, request):
+        fetched_at, limit, error = get_analytics_params(request)
+        if error:
+            return error
+
+        data = cached_response_data(
+            'volume-leaders',
+            lambda: {"date": fetched_at.isoformat(), "results": analytics.volume_leaders(fetched_at, limit)},
+            date=fetched_at.isoformat(), limit=limit,
+        )
+        return Response(data)
+
+
+class QuoteAssetSummaryAPIView(APIView):
+    authentication_classes = [RevocableStatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Get Per Quote Asset Summary",
+        description=f"Returns pair count, quote volume and price change stats for the "
+                    f"{', '.join(analytics.QUOTE_ASSETS)} markets.",
+        parameters=ANALYTICS_PARAMETERS[:1],
+        responses={200: dict, 400: dict, 404: dict},
+    )
+    def get(self, request):
+        fetched_at, _, error = get_analytics_params(request)
+        if error:
+            return error
+
+        data = cached_response_data(
+            'quote-summary',
+            lambda: {"date": fetched_at.isoformat(), "results": analytics.quote_asset_summary(fetched_at)},
+            date=fetched_at.isoformat(),
+        )
+        return Response(data)
 
 
 # TODO: In oder to have the api exposed and to render it via other front end library
 class CoinChartDataAPIView(APIView):
+    authentication_classes = [RevocableStatelessJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, *EXPORT_RENDERERS]
 
     @extend_schema(
         summary="Get Historical Chart Data for a Coin",
-        description="Returns historical last price and price change % for chart plotting.",
+        description="Returns historical last price and price change % for chart plotting." + FORMAT_DESCRIPTION,
         parameters=[
-            OpenApiParameter(name='symbol', description='Symbol (e.g., BTCUSDT)', required=True, type=str)
+            OpenApiParameter(name='symbol', description='Symbol (e.g., BTCUSDT)', required=True, type=str),
+            OpenApiParameter(name='resolution', description='Chart resolution', required=False, type=str,
+                             enum=RESOLUTIONS, default='1d'),
         ],
         responses={200: dict, 404: dict}
     )
@@ -114,22 +429,96 @@ class CoinChartDataAPIView(APIView):
         if not symbol:
             return Response({"error": "Missing symbol param"}, status=status.HTTP_400_BAD_REQUEST)
 
-        tickers = Ticker.objects.filter(symbol=symbol.upper()).order_by('fetched_at')
+        resolution = request.GET.get('resolution', '1d')
+        if resolution not in RESOLUTIONS:
+            return Response({"error": f"resolution must be one of {', '.join(RESOLUTIONS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
 
-        if not tickers.exists():
-            return Response({"error": "No data found for this symbol."}, status=status.HTTP_404_NOT_FOUND)
+        if isinstance(request.accepted_renderer, StreamingRowsRenderer):
+            points = iter_chart_points(symbol.upper(), resolution)
+            first = next(points, None)
+            if first is None:
+                return Response({"error": "No data found for this symbol."}, status=status.HTTP_404_NOT_FOUND)
+            return stream_rows(request, CHART_FIELDS, chain([first], points), f"{symbol.upper()}-{resolution}")
+
+        def build():
+            return [dict(zip(CHART_FIELDS, point)) for point in get_chart_points(symbol.upper(), resolution)]
+
+        scopes = ("tickers",) if resolution == '1d' else ("snapshots",)
+        data = cached_response_data('chart-data', build, scopes=scopes, symbol=symbol.upper(), resolution=resolution)
 
-        data = [
-            {
-                "date": t.fetched_at.isoformat(),
-                "last_price": t.last_price,
-                "price_change_percent": t.price_change_percent,
-            }
-            for t in tickers
-        ]
+        if not data:
+            return Response({"error": "No data found for this symbol."}, status=status.HTTP_404_NOT_FOUND)
         return Response(data)
 
 
+class TickerExportAPIView(APIView):
+    authentication_classes = [RevocableStatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [CSVRowsRenderer, NDJSONRowsRenderer]
+
+    @extend_schema(
+        summary="Export Ticker History",
+        description="Streams every stored ticker row in the date range as CSV (default) or NDJSON, ordered by "
+                    "day and symbol, gzip encoded when the client sends `Accept-Encoding: gzip`. The rows are "
+                    "read and compressed chunk by chunk, so the export size is not limited.",
+        parameters=[
+            OpenApiParameter(name='start', description='First day (YYYY-MM-DD), the oldest stored day by default',
+                             required=False, type=str),
+            OpenApiParameter(name='end', description='Last day (YYYY-MM-DD), the latest stored day by default',
+                             required=False, type=str),
+            OpenApiParameter(name='symbol', description='Comma separated symbols to export (e.g. BTCUSDT,ETHUSDT)',
+                             required=False, type=str),
+            OpenApiParameter(name='fields', description='Comma separated subset of the ticker fields to export. '
+                                                        'One of: ' + ', '.join(TICKER_OUTPUT_FIELDS),
+                             required=False, type=str),
+            OpenApiParameter(name='format', description='Export format', required=False, type=str,
+                             enum=('csv', 'ndjson')),
+        ],
+        responses={200: TickerSerializer(many=True), 400: dict},
+    )
+    def get(self, request):
+        try:
+            start, end = (request.GET.get(name) for name in ('start', 'end'))
+            start = date.fromisoformat(start) if start else None
+            end = date.fromisoformat(end) if end else None
+        except ValueError:
+            return Response({"error": "Invalid start or end date"}, status=status.HTTP_400_BAD_REQUEST)
+        if start and end and start > end:
+            return Response({"error": "start must not be after end"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            fields = parse_ticker_fields(request.GET.get('fields'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = Ticker.objects.all()
+        if start:
+            queryset = queryset.filter(fetched_at__gte=start)
+        if end:
+            queryset = queryset.filter(fetched_at__lte=end)
+        symbols = [s.strip().upper() for s in request.GET.get('symbol', '').split(',') if s.strip()]
+        if symbols:
+            queryset = queryset.filter(symbol__in=symbols)
+
+        to_tuple = ticker_row_formatter(fields)
+        rows = queryset.order_by('fetched_at', 'symbol').values_list(*fields).iterator(chunk_size=STREAM_CHUNK_SIZE)
+        filename = f"tickers-{start or 'first'}-{end or 'last'}"
+        return stream_rows(request, fields, map(to_tuple, rows), filename, attachment=True, compress=True)
+
+
+class CacheStatsAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Get Ticker Cache Stats",
+        description="Returns the hit / miss counters of the ticker response cache, whether it is in use "
+                    "(`shared`, it needs REDIS_CACHE_URL) and the current ingestion generations.",
+        responses={200: dict},
+    )
+    def get(self, request):
+        return Response(cache_stats())
+
+
 def coin_chart_view(request, symbol="BTCUSDT"):
     """
     get chart view will render the chart view and its unauthenticated
@@ -137,16 +526,21 @@ def coin_chart_view(request, symbol="BTCUSDT"):
     :param symbol: you have to send the SYMBOL of the coin for which you are looking the data
     :return: return the HTML response
     """
-    tickers = Ticker.objects.filter(symbol=symbol.upper()).order_by('fetched_at')
+    resolution = request.GET.get('resolution', '1d')
+    if resolution not in RESOLUTIONS:
+        resolution = '1d'
+    points = get_chart_points(symbol.upper(), resolution)
 
-    labels = [t.fetched_at.strftime("%Y-%m-%d") for t in tickers]
-    prices = [float(t.last_price) for t in tickers]
-    changes = [float(t.price_change_percent) for t in tickers]
+    # "YYYY-MM-DD" for days, "YYYY-MM-DD HH:MM" for intraday timestamps
+    labels = [ts[:16].replace("T", " ") for ts, _, _ in points]
+    prices = [float(last_price) for _, last_price, _ in points]
+    changes = [float(change) for _, _, change in points]
 
     context = {
         "symbol": symbol.upper(),
         "labels": labels,
         "prices": prices,
         "changes": changes,
+        "resolution": resolution,
     }
     return render(request, "coins/coin_chart.html", context)
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+
+from app import http_client
+from app.bench import format_table, summarize, timed
+from weather import services
+
+
+def stub_payload(stations):
+    return {
+        "metadata": {
+            "stations": [
+                {
+                    "id": f"S{index}",
+                    "device_id": f"S{index}",
+                    "name": f"Station {index}",
+                    "location": {"latitude": 1.3 + index / 1000, "longitude": 103.8 + index / 1000},
+                }
+                for index in range(stations)
+            ],
+        },
+        "items": [
+            {
+                "timestamp": "2024-03-01T12:00:00+08:00",
+                "readings": [{"station_id": f"S{index}", "value": 28.5} for index in range(stations)],
+            },
+        ],
+    }
+
+
+class StubUpstream(ThreadingHTTPServer):
+    """
+    Local stand-in for data.gov.sg, answers every GET with the same payload after `delay` seconds
+    """
+    daemon_threads = True
+    # the async side opens up to MAX_CONNECTIONS connections at once
+    request_queue_size = 1024
+
+    def __init__(self, delay, body):
+        self.delay = delay
+        self.body = body
+        super().__init__(("127.0.0.1", 0), StubHandler)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1/environment/air-temperature"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # keep-alive, like the real upstream
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(self.server.delay)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.server.body)))
+        self.end_headers()
+        self.wfile.write(self.server.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _refresh():
+    # what a request without a usable snapshot does: fetch upstream and build the response rows
+    data = services.fetch_air_temperature_data()
+    if not data:
+        raise RuntimeError("upstream call failed")
+    services.build_weather_snapshot(data)
+
+
+async def _arefresh():
+    data = await services.afetch_air_temperature_data()
+    if not data:
+        raise RuntimeError("upstream call failed")
+    services.build_weather_snapshot(data)
+
+
+def run_sync(threads, duration):
+    """
+    `threads` blocking callers, as many sync workers serve that many requests at once
+    :return: (latencies, errors)
+    """
+    deadline = time.monotonic() + duration
+
+    def caller():
+        latencies, errors = [], 0
+        while time.monotonic() < deadline:
+            try:
+                latencies.append(timed(_refresh)[1])
+            except Exception:
+                errors += 1
+        return latencies, errors
+
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(lambda _: caller(), range(threads)))
+    return [latency for latencies, _ in results for latency in latencies], sum(errors for _, errors in results)
+
+
+async def run_async(tasks, duration):
+    """
+    `tasks` concurrent callers on one event loop, as one ASGI worker keeps that many requests in flight
+    :return: (latencies, errors)
+    """
+    deadline = time.monotonic() + duration
+    latencies, errors = [], 0
+
+    async def caller():
+        nonlocal errors
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                await _arefresh()
+            except Exception:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - started)
+
+    try:
+        await asyncio.gather(*(caller() for _ in range(tasks)))
+    finally:
+        await http_client.get_async_client().aclose()
+    return latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the sync and async weather upstream calls against a local stub of data.gov.sg. The snapshot "
+        "is never reused, every operation is one upstream call plus building the response rows"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--duration", type=float, default=10, help="seconds each mode runs")
+        parser.add_argument("--delay", type=float, default=1, help="seconds the stub upstream takes to answer")
+        parser.add_argument("--stations", type=int, default=60, help="stations in the stub payload")
+        parser.add_argument("--threads", type=int, default=4, help="concurrent sync callers, like sync workers")
+        parser.add_argument("--tasks", type=int, default=100, help="concurrent async callers on one event loop")
+
+    def handle(self, *args, **options):
+        duration = options["duration"]
+        upstream = StubUpstream(options["delay"], json.dumps(stub_payload(options["stations"])).encode())
+        threading.Thread(target=upstream.serve_forever, daemon=True).start()
+        self.stdout.write(
+            f"Stub upstream at {upstream.url}, {options['delay']:g} s per call, {duration:g} s per mode"
+        )
+
+        rows = []
+        try:
+            with mock.patch.object(services, "AIR_TEMPERATURE_URL", upstream.url):
+                latencies, errors = run_sync(options["threads"], duration)
+                rows.append(summarize(f"sync, {options['threads']} threads", latencies, duration, errors))
+                latencies, errors = asyncio.run(run_async(options["tasks"], duration))
+                rows.append(summarize(f"async, {options['tasks']} tasks", latencies, duration, errors))
+        finally:
+            upstream.shutdown()
+            upstream.server_close()
+
+        self.stdout.write(format_table(rows))
+        failed = sum(row["errors"] for row in rows)
+        if failed:
+            self.stdout.write(f"❌ {failed} upstream calls failed.")
+        else:
+            self.stdout.write("✅ No upstream call failed.")
@@ -1,3 +1,30 @@
 from django.db import models
 
-# Create your models here.
+
+class WeatherStation(models.Model):
+    station_id = models.CharField(max_length=20, unique=True)
+    device_id = models.CharField(max_length=20, blank=True)
+    name = models.CharField(max_length=100)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.station_id} {self.name}"
+
+
+class TemperatureReading(models.Model):
+    station = models.ForeignKey(WeatherStation, on_delete=models.CASCADE, related_name="readings")
+    timestamp = models.DateTimeField()
+    value = models.FloatField()
+
+    class Meta:
+        # the unique index on (station, timestamp) also serves per station time range queries
+        unique_together = ('station', 'timestamp')
+        indexes = [
+            models.Index(fields=['timestamp']),
+        ]
+
+    def __str__(self):
+        return f"{self.station_id} at {self.timestamp}: {self.value}"
@@ -5,3 +5,17 @@ class WeatherDataSerializer(serializers.Serializer):
     latitude = serializers.FloatField()
     longitude = serializers.FloatField()
     temperature = serializers.FloatField()
+
+
+class WeatherNearestSerializer(WeatherDataSerializer):
+    station_id = serializers.CharField()
+    distance_km = serializers.FloatField(allow_null=True)
+
+
+class WeatherAggregateSerializer(serializers.Serializer):
+    station_id = serializers.CharField()
+    bucket = serializers.DateTimeField()
+    min_temperature = serializers.FloatField()
+    max_temperature = serializers.FloatField()
+    avg_temperature = serializers.FloatField()
+    readings = serializers.IntegerField()
@@ -1,12 +1,264 @@
+import asyncio
+import logging
+import time
+
+import httpx
 import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from app import http_client
+from app.http_client import CircuitOpenError
+
+from .models import TemperatureReading, WeatherStation
+from .spatial import StationIndex
+
+logger = logging.getLogger(__name__)
+
+AIR_TEMPERATURE_URL = "https://api.data.gov.sg/v1/environment/air-temperature"
+
+SNAPSHOT_CACHE_KEY = "weather:snapshot"
+REFRESH_LOCK_KEY = "weather:refresh-lock"
+SYNC_REFRESH_LOCK_KEY = "weather:sync-refresh-lock"
+
+# seconds a request without a usable snapshot waits for the one refreshing it, then it gets a 503
+REFRESH_WAIT_TIMEOUT = 10
+REFRESH_POLL_INTERVAL = 0.1
 
+# readings per INSERT statement
+BATCH_SIZE = 500
 
-def fetch_air_temperature_data():
-    url = "https://api.data.gov.sg/v1/environment/air-temperature"
+# latest snapshot seen by this process, saves a cache round trip on every request
+_local_snapshot = None
+
+
+def fetch_air_temperature_data(params=None):
+    """
+    :param params: optional upstream query params, e.g. {"date": "2025-04-01"} for a whole day of readings
+    """
     try:
-        response = requests.get(url, timeout=10)
+        response = http_client.get(AIR_TEMPERATURE_URL, params=params)
         response.raise_for_status()
         return response.json()
-    except requests.RequestException as e:
-        print(f"Error fetching air temperature data: {e}")
+    except (requests.RequestException, CircuitOpenError) as e:
+        logger.warning("Error fetching air temperature data: %s", e)
         return None
+
+
+def build_weather_snapshot(data):
+    """
+    Turns the upstream payload into the response rows, prebuilt once per refresh.
+    :return: dict with `stations` (station id -> row), `results` (rows of the latest readings),
+             `index` (spatial index over the station coordinates) and the `fetched_at` epoch seconds
+    """
+    readings = {r["station_id"]: r["value"] for r in data["items"][0]["readings"]}
+
+    def row(station, temperature):
+        return {
+            "station_name": station.get("name"),
+            "latitude": station.get("location", {}).get("latitude"),
+            "longitude": station.get("location", {}).get("longitude"),
+            "temperature": temperature,
+        }
+
+    stations = {s["id"]: s for s in data["metadata"]["stations"]}
+    rows = {sid: row(station, readings.get(sid)) for sid, station in stations.items()}
+    return {
+        "fetched_at": time.time(),
+        "stations": rows,
+        "results": [row(stations.get(sid, {}), temp) for sid, temp in readings.items()],
+        "index": StationIndex((sid, r["latitude"], r["longitude"]) for sid, r in rows.items()),
+    }
+
+
+def refresh_weather_snapshot(data=None):
+    """
+    Publishes a new snapshot to the shared cache
+    :param data: upstream payload, fetched when not given
+    :return: the new snapshot, None if the upstream call failed
+    """
+    global _local_snapshot
+    try:
+        data = data or fetch_air_temperature_data()
+        if not data:
+            return None
+        _local_snapshot = build_weather_snapshot(data)
+        cache.set(SNAPSHOT_CACHE_KEY, _local_snapshot, None)
+        return _local_snapshot
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
+
+
+def _request_refresh():
+    # only one background refresh at a time
+    if not cache.add(REFRESH_LOCK_KEY, 1, settings.WEATHER_REFRESH_INTERVAL):
+        return
+    from .tasks import refresh_weather
+
+    try:
+        refresh_weather.delay()
+    except Exception:
+        logger.exception("Could not dispatch the weather refresh")
+        cache.delete(REFRESH_LOCK_KEY)
+
+
+def _is_fresh(snapshot):
+    return snapshot is not None and time.time() - snapshot["fetched_at"] <= settings.WEATHER_REFRESH_INTERVAL
+
+
+def _shared_snapshot():
+    # another process may have refreshed it already
+    global _local_snapshot
+    _local_snapshot = cache.get(SNAPSHOT_CACHE_KEY) or _local_snapshot
+    return _local_snapshot
+
+
+def _usable(snapshot):
+    return snapshot is not None and time.time() - snapshot["fetched_at"] <= settings.WEATHER_MAX_STALENESS
+
+
+def _refresh_single_flight():
+    """
+    Synchronous refresh for requests without a usable snapshot. Only the request holding
+    SYNC_REFRESH_LOCK_KEY calls upstream, the others poll the cache for its snapshot.
+    :return: the new snapshot, None if the refresh failed or did not land within REFRESH_WAIT_TIMEOUT
+    """
+    if cache.add(SYNC_REFRESH_LOCK_KEY, 1, settings.WEATHER_REFRESH_INTERVAL):
+        try:
+            return refresh_weather_snapshot()
+        finally:
+            cache.delete(SYNC_REFRESH_LOCK_KEY)
+
+    deadline = time.monotonic() + REFRESH_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(REFRESH_POLL_INTERVAL)
+        snapshot = _shared_snapshot()
+        if _usable(snapshot):
+            return snapshot
+        if cache.get(SYNC_REFRESH_LOCK_KEY) is None:
+            # the refresh is over, it failed unless its snapshot landed since the last read
+            snapshot = _shared_snapshot()
+            return snapshot if _usable(snapshot) else None
+    return None
+
+
+def get_weather_snapshot():
+    """
+    Returns the weather snapshot with stale-while-revalidate semantics.
+
+    A snapshot older than `WEATHER_REFRESH_INTERVAL` is still served while a background refresh is
+    dispatched, one older than `WEATHER_MAX_STALENESS` is refreshed synchronously by a single request.
+    :return: snapshot dict, None if there is no usable snapshot and the upstream call failed
+    """
+    snapshot = _local_snapshot
+    if _is_fresh(snapshot):
+        return snapshot
+
+    snapshot = _shared_snapshot()
+    if not _usable(snapshot):
+        return _refresh_single_flight()
+    if time.time() - snapshot["fetched_at"] > settings.WEATHER_REFRESH_INTERVAL:
+        _request_refresh()
+    return snapshot
+
+
+async def afetch_air_temperature_data(params=None):
+    """
+    Async variant of `fetch_air_temperature_data` on the shared pooled client
+    """
+    try:
+        response = await http_client.aget(AIR_TEMPERATURE_URL, params=params)
+        response.raise_for_status()
+        return response.json()
+    except (httpx.HTTPError, CircuitOpenError) as e:
+        logger.warning("Error fetching air temperature data: %s", e)
+        return None
+
+
+async def _arefresh_single_flight():
+    """
+    Async variant of `_refresh_single_flight`, waiting does not block the event loop
+    """
+    if await sync_to_async(cache.add)(SYNC_REFRESH_LOCK_KEY, 1, settings.WEATHER_REFRESH_INTERVAL):
+        try:
+            data = await afetch_air_temperature_data()
+            if not data:
+                return None
+            return await sync_to_async(refresh_weather_snapshot)(data)
+        finally:
+            await sync_to_async(cache.delete)(SYNC_REFRESH_LOCK_KEY)
+
+    deadline = time.monotonic() + REFRESH_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(REFRESH_POLL_INTERVAL)
+        snapshot = await sync_to_async(_shared_snapshot)()
+        if _usable(snapshot):
+            return snapshot
+        if await sync_to_async(cache.get)(SYNC_REFRESH_LOCK_KEY) is None:
+            snapshot = await sync_to_async(_shared_snapshot)()
+            return snapshot if _usable(snapshot) else None
+    return None
+
+
+async def aget_weather_snapshot():
+    """
+    Async variant of `get_weather_snapshot`, the upstream call does not block the event loop
+    """
+    snapshot = _local_snapshot
+    if _is_fresh(snapshot):
+        return snapshot
+
+    snapshot = await sync_to_async(_shared_snapshot)()
+    if not _usable(snapshot):
+        return await _arefresh_single_flight()
+    if time.time() - snapshot["fetched_at"] > settings.WEATHER_REFRESH_INTERVAL:
+        await sync_to_async(_request_refresh)()
+    return snapshot
+
+
+def store_weather_readings(data, batch_size=BATCH_SIZE):
+    """
+    Persists the stations and every reading of an upstream payload. Stations are upserted on their id,
+    readings already stored for a (station, timestamp) are skipped.
+    :return: number of readings in the payload
+    """
+    stations = [
+        WeatherStation(
+            station_id=s["id"],
+            device_id=s.get("device_id", ""),
+            name=s.get("name", ""),
+            latitude=s.get("location", {}).get("latitude"),
+            longitude=s.get("location", {}).get("longitude"),
+        )
+        for s in data["metadata"]["stations"]
+    ]
+
+    count = 0
+    with transaction.atomic():
+        WeatherStation.objects.bulk_create(
+            stations,
+            update_conflicts=True,
+            unique_fields=["station_id"],
+            update_fields=["device_id", "name", "latitude", "longitude", "updated_at"],
+        )
+        station_pks = dict(WeatherStation.objects.values_list("station_id", "pk"))
+
+        batch = []
+        for item in data["items"]:
+            timestamp = parse_datetime(item["timestamp"])
+            for reading in item["readings"]:
+                station_pk = station_pks.get(reading["station_id"])
+                if station_pk is None:
+                    continue
+                batch.append(TemperatureReading(station_id=station_pk, timestamp=timestamp, value=reading["value"]))
+                if len(batch) >= batch_size:
+                    TemperatureReading.objects.bulk_create(batch, ignore_conflicts=True)
+                    count += len(batch)
+                    batch = []
+        if batch:
+            TemperatureReading.objects.bulk_create(batch, ignore_conflicts=True)
+            count += len(batch)
+    return count
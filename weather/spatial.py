@@ -0,0 +1,107 @@
+import heapq
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class StationIndex:
+    """
+    2-d tree over station coordinates for k-nearest and bounding box queries.
+
+    Points are projected equirectangularly around the mean latitude, which is exact enough for
+    ranking at city scale. Reported distances are haversine kilometres.
+    """
+
+    def __init__(self, stations):
+        """
+        :param stations: iterable of (station_id, latitude, longitude)
+        """
+        stations = [s for s in stations if s[1] is not None and s[2] is not None]
+        mean_lat = sum(s[1] for s in stations) / len(stations) if stations else 0.0
+        self.lon_scale = math.cos(math.radians(mean_lat))
+        # (x, y, station_id, latitude, longitude)
+        points = [(lon * self.lon_scale, lat, sid, lat, lon) for sid, lat, lon in stations]
+        self.root = self._build(points, 0)
+        self.size = len(points)
+
+    def _build(self, points, depth):
+        if not points:
+            return None
+        axis = depth % 2
+        points.sort(key=lambda p: p[axis])
+        median = len(points) // 2
+        # node: (point, axis, left, right)
+        return (
+            points[median],
+            axis,
+            self._build(points[:median], depth + 1),
+            self._build(points[median + 1:], depth + 1),
+        )
+
+    def nearest(self, latitude, longitude, k=1, bbox=None):
+        """
+        :param bbox: optional (min_lat, min_lon, max_lat, max_lon) the results must fall in
+        :return: up to `k` (station_id, distance_km) pairs, closest first
+        """
+        target = (longitude * self.lon_scale, latitude)
+        heap = []  # max heap of (-squared distance, station_id, latitude, longitude)
+
+        def visit(node):
+            if node is None:
+                return
+            point, axis, left, right = node
+            if bbox is None or _in_bbox(point, bbox):
+                dist = (point[0] - target[0]) ** 2 + (point[1] - target[1]) ** 2
+                if len(heap) < k:
+                    heapq.heappush(heap, (-dist, point[2], point[3], point[4]))
+                elif dist < -heap[0][0]:
+                    heapq.heapreplace(heap, (-dist, point[2], point[3], point[4]))
+
+            diff = target[axis] - point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            # the far side can only hold closer points if the splitting plane is within reach
+            if len(heap) < k or diff * diff < -heap[0][0]:
+                visit(far)
+
+        if k > 0:
+            visit(self.root)
+        return [
+            (sid, haversine_km(latitude, longitude, lat, lon))
+            for _, sid, lat, lon in sorted(heap, reverse=True)
+        ]
+
+    def within(self, bbox):
+        """
+        :param bbox: (min_lat, min_lon, max_lat, max_lon)
+        :return: station ids inside the box
+        """
+        min_lat, min_lon, max_lat, max_lon = bbox
+        low = (min_lon * self.lon_scale, min_lat)
+        high = (max_lon * self.lon_scale, max_lat)
+        found = []
+
+        def visit(node):
+            if node is None:
+                return
+            point, axis, left, right = node
+            if _in_bbox(point, bbox):
+                found.append(point[2])
+            if low[axis] <= point[axis]:
+                visit(left)
+            if point[axis] <= high[axis]:
+                visit(right)
+
+        visit(self.root)
+        return found
+
+
+def _in_bbox(point, bbox):
+    min_lat, min_lon, max_lat, max_lon = bbox
+    return min_lat <= point[3] <= max_lat and min_lon <= point[4] <= max_lon
@@ -0,0 +1,31 @@
+from celery import shared_task
+from django.core.cache import cache
+
+from .services import REFRESH_LOCK_KEY, fetch_air_temperature_data, refresh_weather_snapshot, store_weather_readings
+
+
+@shared_task
+def refresh_weather():
+    """
+    Refreshes the cached weather snapshot and stores its readings, one upstream call for both
+    """
+    data = fetch_air_temperature_data()
+    if not data:
+        # refresh_weather_snapshot(None) would call the upstream a second time, only release its lock
+        cache.delete(REFRESH_LOCK_KEY)
+        return "Failed to fetch data"
+    refresh_weather_snapshot(data)
+    count = store_weather_readings(data)
+    return f"Weather snapshot refreshed, {count} readings stored"
+
+
+@shared_task
+def ingest_weather_readings(day):
+    """
+    Backfills every reading of `day` (YYYY-MM-DD)
+    """
+    data = fetch_air_temperature_data({"date": day})
+    if not data:
+        return "Failed to fetch data"
+    count = store_weather_readings(data)
+    return f"{count} readings stored for {day}"
@@ -1,3 +1,102 @@
-from django.test import TestCase
+import random
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+
+from .services import REFRESH_LOCK_KEY
+from .spatial import StationIndex, haversine_km
+from .tasks import refresh_weather
+
+
+class RefreshWeatherTaskTests(TestCase):
+    def test_failed_fetch_calls_the_upstream_once_and_releases_the_lock(self):
+        cache.set(REFRESH_LOCK_KEY, 1)
+        with mock.patch("weather.tasks.fetch_air_temperature_data", return_value=None) as fetch, \
+                mock.patch("weather.services.fetch_air_temperature_data", return_value=None) as refetch:
+            self.assertEqual(refresh_weather(), "Failed to fetch data")
+
+        fetch.assert_called_once_with()
+        refetch.assert_not_called()
+        self.assertIsNone(cache.get(REFRESH_LOCK_KEY))
+
+
+class WeatherNearestParamsTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user("a@b.c", "A", password="pw")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+    def test_k_below_one_is_rejected(self):
+        for k in ("0", "-1"):
+            with self.subTest(k=k), mock.patch("weather.views.get_weather_snapshot") as snapshot:
+                response = self.client.get("/api/weather/nearest/", {"lat": 1.3, "lon": 103.8, "k": k})
+
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), {"error": "k must be positive"})
+            snapshot.assert_not_called()
+
+
+class StationIndexTests(SimpleTestCase):
+    def projected(self, index, lat, lon):
+        # the ranking the index uses, squared equirectangular distance
+        return lambda station: round(((station[2] - lon) * index.lon_scale) ** 2 + (station[1] - lat) ** 2, 15)
+
+    def brute_nearest(self, index, stations, lat, lon, k, bbox=None):
+        candidates = [s for s in stations if bbox is None or self.inside(s, bbox)]
+        ranked = sorted(candidates, key=self.projected(index, lat, lon))[:k]
+        return [(s[0], haversine_km(lat, lon, s[1], s[2])) for s in ranked]
+
+    def inside(self, station, bbox):
+        min_lat, min_lon, max_lat, max_lon = bbox
+        return min_lat <= station[1] <= max_lat and min_lon <= station[2] <= max_lon
+
+    def random_bbox(self, rng):
+        lat1, lat2 = sorted(rng.uniform(1.2, 1.5) for _ in range(2))
+        lon1, lon2 = sorted(rng.uniform(103.6, 104.1) for _ in range(2))
+        return lat1, lon1, lat2, lon2
+
+    def test_matches_brute_force_on_random_stations(self):
+        rng = random.Random(7)
+        stations = [(f"S{i}", rng.uniform(1.2, 1.5), rng.uniform(103.6, 104.1)) for i in range(200)]
+        index = StationIndex(stations)
+        for _ in range(200):
+            lat, lon = rng.uniform(1.1, 1.6), rng.uniform(103.5, 104.2)
+            k = rng.choice((1, 2, 5, 17, 250))
+            bbox = self.random_bbox(rng) if rng.random() < 0.5 else None
+            with self.subTest(lat=lat, lon=lon, k=k, bbox=bbox):
+                expected = self.brute_nearest(index, stations, lat, lon, k, bbox)
+                self.assertEqual(index.nearest(lat, lon, k, bbox=bbox), expected)
+                if bbox:
+                    inside = [s[0] for s in stations if self.inside(s, bbox)]
+                    self.assertEqual(sorted(index.within(bbox)), sorted(inside))
+
+    def test_ties_on_a_grid(self):
+        # shared coordinates on both axes, including duplicated points
+        stations = [
+            (f"S{i}-{j}-{n}", 1.3 + i * 0.01, 103.8 + j * 0.01) for i in range(5) for j in range(5) for n in range(2)
+        ]
+        index = StationIndex(stations)
+        by_id = {station[0]: station for station in stations}
+        for lat, lon in ((1.32, 103.82), (1.3, 103.8), (1.335, 103.815)):
+            for k in (1, 4, 9, 50):
+                with self.subTest(lat=lat, lon=lon, k=k):
+                    found = [by_id[sid] for sid, _ in index.nearest(lat, lon, k)]
+                    expected = sorted(stations, key=self.projected(index, lat, lon))[:k]
+                    # equally distant stations may come in any order, their distances may not
+                    self.assertEqual(len(set(found)), len(expected))
+                    self.assertEqual(
+                        list(map(self.projected(index, lat, lon), found)),
+                        list(map(self.projected(index, lat, lon), expected)),
+                    )
+        bbox = (1.31, 103.81, 1.33, 103.83)
+        self.assertEqual(len(index.within(bbox)), 18)
+
+    def test_empty_index_and_missing_coordinates(self):
+        index = StationIndex([("S1", None, 103.8), ("S2", 1.3, None)])
+        self.assertEqual(index.nearest(1.3, 103.8, 3), [])
+        self.assertEqual(index.within((1, 103, 2, 104)), [])
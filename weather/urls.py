@@ -1,7 +1,11 @@
 from django.urls import path
-from .views import WeatherAPIView
+from .views import WeatherAPIView, WeatherHistoryAPIView, WeatherNearestAPIView, weather_async_view
 
 urlpatterns = [
     path("weather/", WeatherAPIView.as_view(), name="weather-data"),
+    path("weather/history/", WeatherHistoryAPIView.as_view(), name="weather-history"),
+    path("weather/nearest/", WeatherNearestAPIView.as_view(), name="weather-nearest"),
+    path("weather/async/", weather_async_view, name="weather-data-async"),
+    path("weather/async/<str:station_id>/", weather_async_view, name="weather-detail-async"),
     path("weather/<str:station_id>/", WeatherAPIView.as_view(), name="weather-detail"),
 ]
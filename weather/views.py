@@ -1,13 +1,46 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Avg, Count, Max, Min
+from django.http import JsonResponse
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .services import fetch_air_temperature_data
-from .serializers import WeatherDataSerializer
+from accounts.authentication import CachedUserStateJWTAuthentication, aauthenticate
+from .services import aget_weather_snapshot, get_weather_snapshot
+from .models import TemperatureReading
+from .serializers import WeatherAggregateSerializer, WeatherDataSerializer, WeatherNearestSerializer
+
+INTERVALS = {"hour": TruncHour, "day": TruncDay}
+
+# most stations a nearest query returns
+MAX_NEAREST = 50
+
+# longest range a single history query may cover
+MAX_HISTORY_RANGE = timedelta(days=366)
+
+
+def parse_timestamp(value):
+    """
+    Parses an ISO datetime or date query param, naive values are taken in the current timezone
+    """
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
 
 
 class WeatherAPIView(APIView):
+    authentication_classes = [CachedUserStateJWTAuthentication]
     permission_classes = [IsAuthenticated]
     """
     Handles:
@@ -24,37 +57,157 @@ class WeatherAPIView(APIView):
                     "provided in the URL."
     )
     def get(self, request, station_id=None):
-        data = fetch_air_temperature_data()
-        if not data:
+        snapshot = get_weather_snapshot()
+        if not snapshot:
             return Response({"error": "Unable to fetch weather data"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
-        stations = {s["id"]: s for s in data["metadata"]["stations"]}
-        readings = {r["station_id"]: r["value"] for r in data["items"][0]["readings"]}
-
         # If station_id is provided, return a single reading
         if station_id:
-            if station_id not in stations:
+            result = snapshot["stations"].get(station_id)
+            if result is None:
                 return Response({"error": "Station not found"}, status=status.HTTP_404_NOT_FOUND)
 
-            station = stations[station_id]
-            result = {
-                "station_name": station.get("name"),
-                "latitude": station.get("location", {}).get("latitude"),
-                "longitude": station.get("location", {}).get("longitude"),
-                "temperature": readings.get(station_id)
-            }
             serializer = WeatherDataSerializer(result)
             return Response(serializer.data)
 
         # Otherwise return all readings
-        results = []
-        for sid, temp in readings.items():
-            station = stations.get(sid, {})
-            results.append({
-                "station_name": station.get("name"),
-                "latitude": station.get("location", {}).get("latitude"),
-                "longitude": station.get("location", {}).get("longitude"),
-                "temperature": temp
-            })
-        serializer = WeatherDataSerializer(results, many=True)
+        serializer = WeatherDataSerializer(snapshot["results"], many=True)
+        return Response({"weather_data": serializer.data}, status=status.HTTP_200_OK)
+
+
+async def weather_async_view(request, station_id=None):
+    """
+    Async twin of WeatherAPIView, same responses. Under ASGI the upstream refresh awaits on the
+    shared client instead of holding a worker thread.
+    """
+    if await aauthenticate(request) is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."}, status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    snapshot = await aget_weather_snapshot()
+    if not snapshot:
+        return JsonResponse({"error": "Unable to fetch weather data"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    if station_id:
+        result = snapshot["stations"].get(station_id)
+        if result is None:
+            return JsonResponse({"error": "Station not found"}, status=status.HTTP_404_NOT_FOUND)
+        return JsonResponse(WeatherDataSerializer(result).data)
+
+    serializer = WeatherDataSerializer(snapshot["results"], many=True)
+    return JsonResponse({"weather_data": serializer.data})
+
+
+class WeatherHistoryAPIView(APIView):
+    authentication_classes = [CachedUserStateJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='station', description='Station ID (e.g., S117), all stations if omitted',
+                             required=False, type=str),
+            OpenApiParameter(name='start', description='Range start, ISO date or datetime (default: 24h ago)',
+                             required=False, type=str),
+            OpenApiParameter(name='end', description='Range end, ISO date or datetime (default: now)',
+                             required=False, type=str),
+            OpenApiParameter(name='interval', description='Aggregation bucket', required=False, type=str,
+                             enum=tuple(INTERVALS), default='hour'),
+        ],
+        responses={200: WeatherAggregateSerializer(many=True)},
+        description="Returns min / max / avg air temperature per station per hour or day over a time range, "
+                    "computed from the stored readings."
+    )
+    def get(self, request):
+        interval = request.GET.get('interval', 'hour')
+        if interval not in INTERVALS:
+            return Response({"error": "interval must be hour or day"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            end = parse_timestamp(request.GET['end']) if 'end' in request.GET else timezone.now()
+            start = parse_timestamp(request.GET['start']) if 'start' in request.GET else end - timedelta(days=1)
+        except ValueError:
+            return Response({"error": "Invalid start or end param"}, status=status.HTTP_400_BAD_REQUEST)
+        if not start < end <= start + MAX_HISTORY_RANGE:
+            return Response({"error": f"start must be before end and the range at most {MAX_HISTORY_RANGE.days} days"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        readings = TemperatureReading.objects.filter(timestamp__gte=start, timestamp__lt=end)
+        station = request.GET.get('station')
+        if station:
+            readings = readings.filter(station__station_id=station)
+
+        results = list(
+            readings.annotate(bucket=INTERVALS[interval]('timestamp'))
+            .values('station__station_id', 'bucket')
+            .annotate(
+                min_temperature=Min('value'),
+                max_temperature=Max('value'),
+                avg_temperature=Avg('value'),
+                readings=Count('id'),
+            )
+            .order_by('station__station_id', 'bucket')
+        )
+        for row in results:
+            row['station_id'] = row.pop('station__station_id')
+
+        serializer = WeatherAggregateSerializer(results, many=True)
+        return Response({
+            "interval": interval,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "results": serializer.data,
+        }, status=status.HTTP_200_OK)
+
+
+class WeatherNearestAPIView(APIView):
+    authentication_classes = [CachedUserStateJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='lat', description='Latitude of the point to search from', required=False,
+                             type=float),
+            OpenApiParameter(name='lon', description='Longitude of the point to search from', required=False,
+                             type=float),
+            OpenApiParameter(name='k', description=f'Number of stations (max {MAX_NEAREST})', required=False,
+                             type=int, default=1),
+            OpenApiParameter(name='bbox', description='Only stations inside min_lon,min_lat,max_lon,max_lat',
+                             required=False, type=str),
+        ],
+        responses={200: WeatherNearestSerializer(many=True)},
+        description="Returns the k weather stations nearest to lat / lon with their latest reading, optionally "
+                    "restricted to a bounding box. With only a bbox, returns every station inside it."
+    )
+    def get(self, request):
+        try:
+            k = min(int(request.GET.get('k', 1)), MAX_NEAREST)
+            lat = float(request.GET['lat']) if 'lat' in request.GET else None
+            lon = float(request.GET['lon']) if 'lon' in request.GET else None
+            bbox = None
+            if 'bbox' in request.GET:
+                min_lon, min_lat, max_lon, max_lat = map(float, request.GET['bbox'].split(','))
+                bbox = (min_lat, min_lon, max_lat, max_lon)
+        except ValueError:
+            return Response({"error": "Invalid lat, lon, k or bbox param"}, status=status.HTTP_400_BAD_REQUEST)
+        if k < 1:
+            return Response({"error": "k must be positive"}, status=status.HTTP_400_BAD_REQUEST)
+        if (lat is None) != (lon is None) or (lat is None and bbox is None):
+            return Response({"error": "Provide lat and lon, a bbox, or both"}, status=status.HTTP_400_BAD_REQUEST)
+
+        snapshot = get_weather_snapshot()
+        if not snapshot:
+            return Response({"error": "Unable to fetch weather data"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        index = snapshot["index"]
+        if lat is None:
+            matches = [(sid, None) for sid in index.within(bbox)]
+        else:
+            matches = index.nearest(lat, lon, k, bbox=bbox)
+
+        results = [
+            {**snapshot["stations"][sid], "station_id": sid, "distance_km": distance}
+            for sid, distance in matches
+        ]
+        serializer = WeatherNearestSerializer(results, many=True)
         return Response({"weather_data": serializer.data}, status=status.HTTP_200_OK)